@@ -77,6 +77,10 @@ class GitConfig:
     LABEL_HIGH_CONFIDENCE = "high-confidence"
     LABEL_NEEDS_HUMAN = "needs-human-attention"
 
+    # Commit identity (also used to tell agent commits from human ones)
+    COMMIT_AUTHOR_NAME = "Autonomous Agent"
+    COMMIT_AUTHOR_EMAIL = "autonomous-agent@apra.ai"
+
     # PR configuration
     PR_TITLE_FORMAT = "🤖 Auto-Fix: {description}"
     PR_BODY_TEMPLATE = """## 🤖 Autonomous DevOps Agent
@@ -191,6 +195,10 @@ class AgentConfig:
     ENABLE_FLAVOR_COORDINATION = True  # Avoid duplicate LLM analysis across flavors
     MAX_COORDINATION_WAIT_MINUTES = 15  # Max time to wait for another flavor's fix
 
+    # On-disk cache of LLM investigations, keyed by error signature + commit
+    INVESTIGATION_CACHE_DIR = ".agent-cache"
+    INVESTIGATION_CACHE_TTL_SECONDS = 7 * 24 * 3600  # 7 days
+
     # Logging
     VERBOSE = True
     LOG_FILE = "agent.log"
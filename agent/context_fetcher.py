@@ -3,15 +3,48 @@ Context Fetcher for Iterative Investigation
 
 Fetches files, log excerpts, and git history as requested by LLM.
 """
+import gzip
+import hashlib
+import json
 import logging
 import os
+import posixpath
+import re
+import shutil
 import subprocess
-import urllib.request
-from typing import Dict, List, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
 logger = logging.getLogger(__name__)
 
+# Upper bound on in-memory cache entries (oldest evicted first)
+CACHE_MAX_ENTRIES = 128
+
+# Number of commit SHAs whose GitHub raw files are kept on disk
+GITHUB_CACHE_MAX_SHAS = 5
+
+# Runs of backticks, for choosing a code fence that content cannot close
+_BACKTICK_RUN_RE = re.compile(r'`+')
+
+# Extensions reported as binary without reading the file
+BINARY_EXTENSIONS = frozenset({
+    '.png', '.jpg', '.jpeg', '.gif', '.bmp', '.ico', '.pdf',
+    '.zip', '.gz', '.tgz', '.bz2', '.xz', '.7z', '.tar', '.jar',
+    '.so', '.dll', '.dylib', '.a', '.lib', '.o', '.obj', '.exe', '.bin',
+    '.pyc', '.whl', '.parquet', '.mp4', '.avi', '.mov', '.h264'
+})
+
+
+def _line_count(text: str) -> int:
+    """Count lines as len(text.splitlines()) would, without building the list"""
+    return text.count('\n') + (1 if text and not text.endswith('\n') else 0)
+
 
 class ContextFetcher:
     """
@@ -19,7 +52,8 @@ class ContextFetcher:
     """
 
     def __init__(self, repo_root: str, max_file_size: int = 100000,
-                 github_repo: Optional[str] = None, commit_sha: Optional[str] = None):
+                 github_repo: Optional[str] = None, commit_sha: Optional[str] = None,
+                 cache_dir: Optional[str] = None):
         """
         Initialize context fetcher
 
@@ -28,11 +62,67 @@ class ContextFetcher:
             max_file_size: Maximum file size in bytes to fetch
             github_repo: GitHub repository (e.g., "Apra-Labs/ApraPipes")
             commit_sha: Current commit SHA for fetching from GitHub
+            cache_dir: Directory for persisting GitHub raw files across runs
+                (None keeps them in memory only)
         """
         self.repo_root = Path(repo_root)
+        self._resolved_root = self.repo_root.resolve()
         self.max_file_size = max_file_size
         self.github_repo = github_repo
         self.commit_sha = commit_sha
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+
+        # File contents keyed by resolved path -> (mtime_ns, size, content, lines),
+        # so files re-requested across turns are not re-read while unchanged
+        self._file_cache: Dict[str, tuple] = {}
+
+        # GitHub raw contents keyed by (repo, sha, path); content at a fixed
+        # SHA is immutable, so entries never go stale
+        self._github_cache: Dict[tuple, str] = {}
+
+        # ETag validators keyed by URL -> (etag, content), for conditional
+        # re-fetches of URLs that are not pinned to a commit
+        self._etags: Dict[str, tuple] = {}
+
+        # Successful git_log results keyed by target. History does
+        # not change while an investigation runs, and repeat requests across
+        # turns would otherwise each start a new git process
+        self._git_log_cache: Dict[str, Dict] = {}
+
+        # Raw branch history output keyed by (branch, limit, format, extra args),
+        # shared by get_recent_commits_with_context and analyze_regression
+        self._commit_cache: Dict[tuple, str] = {}
+
+        # Requests are fetched from worker threads
+        self._cache_lock = threading.Lock()
+
+        # Shared HTTP session (created on first GitHub fetch) so raw file
+        # downloads reuse pooled keep-alive connections
+        self._session: Optional[requests.Session] = None
+
+        # Line start offsets keyed by resolved path -> (mtime_ns, size, offsets)
+        self._line_index_cache: Dict[str, tuple] = {}
+
+        # Whether get_recent_commits_with_context already tried to deepen
+        self._deepened = False
+
+        # Tracked regular files (see _tracked_files), listed on first fetch
+        self._tracked: Optional[frozenset] = None
+
+        # Long-lived `git cat-file --batch` process serving blobs at commit_sha
+        # without a network round trip (see _read_git_blob). False once git
+        # could not serve objects, so it is not respawned per request
+        self._cat_file = None
+        self._cat_file_lock = threading.Lock()
+
+        # Request type -> fetch method
+        self._handlers = {
+            'file': self._fetch_file,
+            'file_range': self._fetch_file_range,
+            'github_raw': self._fetch_github_raw,
+            'log_excerpt': self._fetch_log_excerpt,
+            'git_log': self._fetch_git_log
+        }
 
     def fetch_requests(self, requests: List[Dict]) -> List[Dict]:
         """
@@ -44,35 +134,65 @@ class ContextFetcher:
         Returns:
             List of fulfilled requests with content
         """
-        results = []
+        # Per-file git history for the whole batch comes from one git log
+        results = self._fetch_git_logs_batched(requests)
+
+        # Identical (type, target) requests in one batch are fetched once
+        first_seen: Dict[tuple, int] = {}
+        duplicates: Dict[int, int] = {}
+        remaining = []
+        for i, req in enumerate(requests):
+            if i in results:
+                continue
+            key = (req.get('type'), str(req.get('target')))
+            if key in first_seen:
+                duplicates[i] = first_seen[key]
+            else:
+                first_seen[key] = i
+                remaining.append(i)
 
-        for req in requests:
-            req_type = req.get('type')
-            target = req.get('target')
-            reason = req.get('reason', '')
+        if len(remaining) <= 1:
+            for i in remaining:
+                results[i] = self._fetch_one(requests[i])
+        else:
+            # Requests are independent and I/O bound (disk, git, network), so
+            # run them concurrently; map() keeps results in request order
+            with ThreadPoolExecutor(max_workers=min(8, len(remaining))) as executor:
+                fetched = executor.map(self._fetch_one, [requests[i] for i in remaining])
+                results.update(zip(remaining, fetched))
 
-            logger.info(f"Fetching {req_type}: {target} (reason: {reason})")
+        for i, first in duplicates.items():
+            results[i] = dict(results[first], reason=requests[i].get('reason', ''))
 
-            if req_type == 'file':
-                result = self._fetch_file(target, reason)
-            elif req_type == 'github_raw':
-                result = self._fetch_github_raw(target, reason)
-            elif req_type == 'log_excerpt':
-                result = self._fetch_log_excerpt(target, reason)
-            elif req_type == 'git_log':
-                result = self._fetch_git_log(target, reason)
-            else:
-                result = {
-                    'type': req_type,
-                    'target': target,
-                    'reason': reason,
-                    'status': 'error',
-                    'content': f"Unknown request type: {req_type}"
-                }
+        return [results[i] for i in range(len(requests))]
+
+    def _fetch_one(self, req: Dict) -> Dict:
+        """
+        Fetch a single requested context item
 
-            results.append(result)
+        Args:
+            req: Request dict from LLM
+
+        Returns:
+            Fulfilled request with content
+        """
+        req_type = req.get('type')
+        target = req.get('target')
+        reason = req.get('reason', '')
+
+        logger.info(f"Fetching {req_type}: {target} (reason: {reason})")
 
-        return results
+        handler = self._handlers.get(req_type)
+        if handler:
+            return handler(target, reason)
+
+        return {
+            'type': req_type,
+            'target': target,
+            'reason': reason,
+            'status': 'error',
+            'content': f"Unknown request type: {req_type}"
+        }
 
     def _fetch_file(self, filepath: str, reason: str) -> Dict:
         """
@@ -85,30 +205,21 @@ class ContextFetcher:
         Returns:
             Dict with file content or error
         """
-        full_path = self.repo_root / filepath
-
-        # Security check - prevent path traversal
-        try:
-            full_path = full_path.resolve()
-            if not str(full_path).startswith(str(self.repo_root.resolve())):
-                return {
-                    'type': 'file',
-                    'target': filepath,
-                    'reason': reason,
-                    'status': 'error',
-                    'content': f"Security error: Path outside repository"
-                }
-        except Exception as e:
+        full_path, error = self._locate(filepath)
+        if error:
             return {
                 'type': 'file',
                 'target': filepath,
                 'reason': reason,
                 'status': 'error',
-                'content': f"Path resolution error: {e}"
+                'content': error
             }
 
-        # Check if file exists
-        if not full_path.exists():
+        # Open once and take size/mtime from the descriptor, so existence,
+        # size and content all come from the same file
+        try:
+            fd = os.open(full_path, os.O_RDONLY)
+        except FileNotFoundError:
             return {
                 'type': 'file',
                 'target': filepath,
@@ -116,23 +227,82 @@ class ContextFetcher:
                 'status': 'not_found',
                 'content': f"File not found: {filepath}"
             }
-
-        # Check file size
-        file_size = full_path.stat().st_size
-        if file_size > self.max_file_size:
+        except OSError as e:
             return {
                 'type': 'file',
                 'target': filepath,
                 'reason': reason,
-                'status': 'too_large',
-                'content': f"File too large: {file_size} bytes (max: {self.max_file_size})\n" +
-                          f"Consider requesting specific line ranges or excerpts."
+                'status': 'error',
+                'content': f"Error reading file: {e}"
             }
 
-        # Read file
         try:
-            with open(full_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+            # Check file size
+            stat = os.fstat(fd)
+            file_size = stat.st_size
+            if file_size > self.max_file_size:
+                return {
+                    'type': 'file',
+                    'target': filepath,
+                    'reason': reason,
+                    'status': 'too_large',
+                    'content': f"File too large: {file_size} bytes (max: {self.max_file_size})\n" +
+                              f"Request specific lines with a file_range request instead."
+                }
+
+            if full_path.suffix.lower() in BINARY_EXTENSIONS:
+                return {
+                    'type': 'file',
+                    'target': filepath,
+                    'reason': reason,
+                    'status': 'binary',
+                    'content': f"Binary file ({file_size} bytes)"
+                }
+
+            # Read file (or reuse cached content if unchanged on disk)
+            cache_key = str(full_path)
+            cached = self._file_cache.get(cache_key)
+            if cached and cached[:2] == (stat.st_mtime_ns, file_size):
+                content, lines = cached[2:]
+            else:
+                # Stream in 64 KiB chunks, counting newlines as we go and
+                # stopping if the file grew past the limit since fstat
+                buf = bytearray()
+                newlines = 0
+                while True:
+                    chunk = os.read(fd, 65536)
+                    if not chunk:
+                        break
+                    if not buf and b'\x00' in chunk[:8192]:
+                        # NUL in the first 8 KiB: binary, skip the decode
+                        return {
+                            'type': 'file',
+                            'target': filepath,
+                            'reason': reason,
+                            'status': 'binary',
+                            'content': f"Binary file ({file_size} bytes), "
+                                       f"first bytes: {chunk[:64].hex()}"
+                        }
+                    newlines += chunk.count(b'\n')
+                    buf += chunk
+                    if len(buf) > self.max_file_size:
+                        return {
+                            'type': 'file',
+                            'target': filepath,
+                            'reason': reason,
+                            'status': 'too_large',
+                            'content': f"File too large: over {self.max_file_size} bytes\n" +
+                                      f"Request specific lines with a file_range request instead."
+                        }
+                content = buf.decode('utf-8', errors='ignore')
+                if '\r' in content:
+                    # Same newlines as reading in text mode
+                    content = content.replace('\r\n', '\n').replace('\r', '\n')
+                    lines = _line_count(content)
+                else:
+                    lines = newlines + (1 if content and not content.endswith('\n') else 0)
+                self._cache_put(self._file_cache, cache_key,
+                                (stat.st_mtime_ns, file_size, content, lines))
 
             return {
                 'type': 'file',
@@ -142,7 +312,7 @@ class ContextFetcher:
                 'content': content,
                 'metadata': {
                     'size_bytes': file_size,
-                    'lines': len(content.splitlines())
+                    'lines': lines
                 }
             }
         except Exception as e:
@@ -153,6 +323,195 @@ class ContextFetcher:
                 'status': 'error',
                 'content': f"Error reading file: {e}"
             }
+        finally:
+            os.close(fd)
+
+    def _fetch_file_range(self, spec: Dict, reason: str) -> Dict:
+        """
+        Fetch a range of lines from a repository file
+
+        Seeks straight to the requested lines using a per-file index of line
+        offsets, so large files can be inspected without reading them whole.
+
+        Args:
+            spec: Dict with 'path', 'start' and 'end' (1-based, inclusive)
+            reason: Why LLM needs these lines
+
+        Returns:
+            Dict with the requested lines or error
+        """
+        try:
+            filepath = spec['path']
+            start = int(spec['start'])
+            end = int(spec['end'])
+            if start < 1 or end < start:
+                raise ValueError(f"invalid line range {start}-{end}")
+        except (TypeError, KeyError, ValueError) as e:
+            return {
+                'type': 'file_range',
+                'target': spec,
+                'reason': reason,
+                'status': 'error',
+                'content': f"Invalid file_range target (expected path/start/end): {e}"
+            }
+
+        full_path, error = self._locate(filepath)
+        if error:
+            return {
+                'type': 'file_range',
+                'target': spec,
+                'reason': reason,
+                'status': 'error',
+                'content': error
+            }
+
+        try:
+            with open(full_path, 'rb') as f:
+                offsets = self._line_offsets(full_path, f)
+                total_lines = len(offsets) - 1
+                end = min(end, total_lines)
+                if start > total_lines:
+                    return {
+                        'type': 'file_range',
+                        'target': spec,
+                        'reason': reason,
+                        'status': 'error',
+                        'content': f"Line {start} is past the end of {filepath} ({total_lines} lines)"
+                    }
+
+                length = offsets[end] - offsets[start - 1]
+                if length > self.max_file_size:
+                    return {
+                        'type': 'file_range',
+                        'target': spec,
+                        'reason': reason,
+                        'status': 'too_large',
+                        'content': f"Range too large: {length} bytes (max: {self.max_file_size})\n" +
+                                  f"Request fewer lines."
+                    }
+
+                f.seek(offsets[start - 1])
+                data = f.read(length)
+        except FileNotFoundError:
+            return {
+                'type': 'file_range',
+                'target': spec,
+                'reason': reason,
+                'status': 'not_found',
+                'content': f"File not found: {filepath}"
+            }
+        except OSError as e:
+            return {
+                'type': 'file_range',
+                'target': spec,
+                'reason': reason,
+                'status': 'error',
+                'content': f"Error reading file: {e}"
+            }
+
+        content = data.decode('utf-8', errors='ignore')
+        if '\r' in content:
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
+
+        return {
+            'type': 'file_range',
+            'target': spec,
+            'reason': reason,
+            'status': 'success',
+            'content': content,
+            'metadata': {
+                'start': start,
+                'end': end,
+                'total_lines': total_lines
+            }
+        }
+
+    def _line_offsets(self, full_path: Path, f) -> List[int]:
+        """
+        Get byte offsets of each line start, built once per file version
+
+        Args:
+            full_path: Resolved file path
+            f: File opened in binary mode
+
+        Returns:
+            List where entry i is the offset of line i+1 and the last entry
+            is the file size
+        """
+        stat = os.fstat(f.fileno())
+        cache_key = str(full_path)
+        cached = self._line_index_cache.get(cache_key)
+        if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+
+        offsets = [0]
+        position = 0
+        for line in f:
+            position += len(line)
+            offsets.append(position)
+        self._cache_put(self._line_index_cache, cache_key,
+                        (stat.st_mtime_ns, stat.st_size, offsets))
+        return offsets
+
+    def _locate(self, filepath: str) -> Tuple[Optional[Path], Optional[str]]:
+        """
+        Map a requested path to a file inside the repository
+
+        Tracked regular files are inside the repo by construction, so they
+        skip the realpath walk; anything else gets the full check.
+
+        Args:
+            filepath: Relative path to file
+
+        Returns:
+            Tuple of (path, None) or (None, error message)
+        """
+        relative = os.path.normpath(filepath)
+        if relative in self._tracked_files():
+            return self._resolved_root / relative, None
+        return self._resolve_in_repo(filepath)
+
+    def _resolve_in_repo(self, filepath: str) -> Tuple[Optional[Path], Optional[str]]:
+        """
+        Resolve a requested path, rejecting anything outside the repository
+
+        Args:
+            filepath: Relative path to file
+
+        Returns:
+            Tuple of (resolved path, None) or (None, error message)
+        """
+        # Security check - prevent path traversal
+        try:
+            full_path = (self.repo_root / filepath).resolve()
+            if not full_path.is_relative_to(self._resolved_root):
+                return None, "Security error: Path outside repository"
+            return full_path, None
+        except Exception as e:
+            return None, f"Path resolution error: {e}"
+
+    def _tracked_files(self) -> frozenset:
+        """
+        Get the repository's tracked regular files, listed once per fetcher
+
+        Symlinks and submodules are left out so they still go through
+        the full path check.
+
+        Returns:
+            Set of paths relative to repo_root (empty outside a git checkout)
+        """
+        if self._tracked is None:
+            try:
+                returncode, stdout, _ = self._run_git(['git', 'ls-files', '-s', '-z'])
+                tracked = frozenset(
+                    path for meta, _, path in (e.partition('\t') for e in stdout.split('\0') if e)
+                    if meta.startswith('100')
+                ) if returncode == 0 else frozenset()
+            except Exception as e:
+                logger.warning(f"Could not list tracked files: {e}")
+                tracked = frozenset()
+            self._tracked = tracked
+        return self._tracked
 
     def _fetch_github_raw(self, url_or_path: str, reason: str) -> Dict:
         """
@@ -176,15 +535,54 @@ class ContextFetcher:
                     'content': 'GitHub repo or commit SHA not configured'
                 }
             url = f"https://raw.githubusercontent.com/{self.github_repo}/{self.commit_sha}/{url_or_path}"
+            cache_key = (self.github_repo, self.commit_sha, url_or_path)
         else:
             url = url_or_path
+            cache_key = None
 
         try:
-            logger.info(f"Fetching from GitHub: {url}")
+            content = self._load_github_cached(cache_key) if cache_key else None
+            revalidated = False
+
+            if content is None and cache_key:
+                # The commit is usually checked out locally; read the blob
+                # from git instead of downloading it
+                blob = self._read_git_blob(f"{self.commit_sha}:{url_or_path}")
+                if blob is not None:
+                    if len(blob) > self.max_file_size:
+                        return {
+                            'type': 'github_raw',
+                            'target': url_or_path,
+                            'reason': reason,
+                            'status': 'too_large',
+                            'content': f"File too large: {len(blob)} bytes (max: {self.max_file_size})\n" +
+                                      f"Request specific lines with a file_range request instead."
+                        }
+                    content = blob.decode('utf-8', errors='ignore')
+                    self._cache_put(self._github_cache, cache_key, content)
+
+            if content is None:
+                content, revalidated = self._download_github_raw(url)
+                if content is None:
+                    return {
+                        'type': 'github_raw',
+                        'target': url_or_path,
+                        'reason': reason,
+                        'status': 'too_large',
+                        'content': f"File too large: over {self.max_file_size} bytes\n" +
+                                  f"Request specific lines with a file_range request instead."
+                    }
+
+                if cache_key:
+                    self._store_github_cached(cache_key, content)
 
-            # Fetch with timeout
-            with urllib.request.urlopen(url, timeout=10) as response:
-                content = response.read().decode('utf-8')
+            metadata = {
+                'url': url,
+                'size_bytes': len(content),
+                'lines': _line_count(content)
+            }
+            if revalidated:
+                metadata['revalidated'] = True
 
             return {
                 'type': 'github_raw',
@@ -192,19 +590,16 @@ class ContextFetcher:
                 'reason': reason,
                 'status': 'success',
                 'content': content,
-                'metadata': {
-                    'url': url,
-                    'size_bytes': len(content),
-                    'lines': len(content.splitlines())
-                }
+                'metadata': metadata
             }
-        except urllib.error.HTTPError as e:
+        except requests.HTTPError as e:
+            code = e.response.status_code
             return {
                 'type': 'github_raw',
                 'target': url_or_path,
                 'reason': reason,
-                'status': 'not_found' if e.code == 404 else 'error',
-                'content': f"HTTP {e.code}: {e.reason}"
+                'status': 'not_found' if code == 404 else 'error',
+                'content': f"HTTP {code}: {e.response.reason}"
             }
         except Exception as e:
             return {
@@ -215,6 +610,319 @@ class ContextFetcher:
                 'content': f"Error fetching from GitHub: {e}"
             }
 
+    def _download_github_raw(self, url: str) -> Tuple[Optional[str], bool]:
+        """
+        Download a raw file over the shared session, revalidating by ETag
+
+        The session requests gzip and decodes it transparently. The body is
+        streamed and the connection dropped as soon as it exceeds max_file_size.
+
+        Args:
+            url: Raw file URL
+
+        Returns:
+            Tuple of (content, revalidated) where revalidated is True when the
+            server answered 304 and the previously downloaded body was reused.
+            content is None if the file is larger than max_file_size.
+
+        Raises:
+            requests.HTTPError: For HTTP errors other than 304
+        """
+        headers = {'Accept-Encoding': 'gzip'}
+        validator = self._load_etag(url)
+        if validator:
+            headers['If-None-Match'] = validator[0]
+
+        logger.info(f"Fetching from GitHub: {url}")
+
+        # Fetch with timeout
+        response = self._http_session().get(url, headers=headers, timeout=10, stream=True)
+        try:
+            if response.status_code == 304 and validator:
+                return validator[1], True
+            response.raise_for_status()
+
+            chunks = []
+            total = 0
+            for chunk in response.iter_content(65536):
+                total += len(chunk)
+                if total > self.max_file_size:
+                    return None, False
+                chunks.append(chunk)
+        finally:
+            response.close()
+
+        content = b''.join(chunks).decode('utf-8')
+        etag = response.headers.get('ETag')
+        if etag:
+            self._store_etag(url, etag, content)
+        return content, False
+
+    def _read_git_blob(self, spec: str) -> Optional[bytes]:
+        """
+        Read a blob from the local repository via a persistent cat-file process
+
+        One `git cat-file --batch` process is started on first use and kept
+        until close(), so each lookup is a pipe round trip instead of a fork.
+
+        Args:
+            spec: Object name such as "<sha>:<path>"
+
+        Returns:
+            Blob bytes, or None if the object is missing, not a blob, or git
+            is unavailable
+        """
+        if '\n' in spec:
+            return None
+
+        with self._cat_file_lock:
+            if self._cat_file is False:
+                return None
+            try:
+                if self._cat_file is None:
+                    self._cat_file = subprocess.Popen(
+                        ['git', 'cat-file', '--batch'],
+                        cwd=self.repo_root,
+                        stdin=subprocess.PIPE,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.DEVNULL,
+                        env={**os.environ, 'LC_ALL': 'C', 'GIT_OPTIONAL_LOCKS': '0'}
+                    )
+                proc = self._cat_file
+                proc.stdin.write(spec.encode('utf-8') + b'\n')
+                proc.stdin.flush()
+
+                # "<sha> <type> <size>" or "<spec> missing"
+                header = proc.stdout.readline()
+                if not header:
+                    raise OSError('git cat-file exited')
+                fields = header.split()
+                if len(fields) != 3 or not fields[2].isdigit():
+                    return None
+
+                size = int(fields[2])
+                data = proc.stdout.read(size + 1)[:size]
+                return data if fields[1] == b'blob' else None
+            except (OSError, ValueError) as e:
+                logger.warning(f"git cat-file unavailable, falling back to GitHub: {e}")
+                self._stop_cat_file()
+                self._cat_file = False
+                return None
+
+    def _stop_cat_file(self) -> None:
+        """Shut down the cat-file process, if running (caller holds _cat_file_lock)"""
+        proc = self._cat_file
+        self._cat_file = None
+        if not proc:
+            return
+        try:
+            proc.stdin.close()
+            proc.wait(timeout=5)
+        except Exception:
+            proc.kill()
+            proc.wait()
+        finally:
+            proc.stdout.close()
+
+    def _etag_file(self, url: str) -> Optional[Path]:
+        """
+        Get the on-disk location of the ETag validator for a URL
+
+        Args:
+            url: Raw file URL
+
+        Returns:
+            Path under cache_dir, or None if disk caching is disabled
+        """
+        if not self.cache_dir:
+            return None
+        name = hashlib.blake2b(url.encode('utf-8'), digest_size=16).hexdigest()
+        return self.cache_dir / '_etags' / f"{name}.json.gz"
+
+    def _load_etag(self, url: str) -> Optional[tuple]:
+        """
+        Look up the (etag, content) validator for a URL in memory, then on disk
+
+        Args:
+            url: Raw file URL
+
+        Returns:
+            Tuple of (etag, content), or None if the URL was never fetched
+        """
+        validator = self._etags.get(url)
+        if validator:
+            return validator
+
+        etag_file = self._etag_file(url)
+        if etag_file is None:
+            return None
+        try:
+            data = json.loads(gzip.decompress(etag_file.read_bytes()))
+            validator = (data['etag'], data['content'])
+        except (OSError, EOFError, ValueError, KeyError):
+            return None
+
+        self._cache_put(self._etags, url, validator)
+        return validator
+
+    def _store_etag(self, url: str, etag: str, content: str) -> None:
+        """
+        Remember a URL's ETag and body so later runs can send If-None-Match
+
+        Args:
+            url: Raw file URL
+            etag: ETag header from the response
+            content: Response body
+        """
+        self._cache_put(self._etags, url, (etag, content))
+
+        etag_file = self._etag_file(url)
+        if etag_file is None:
+            return
+        try:
+            etag_file.parent.mkdir(parents=True, exist_ok=True)
+            etag_file.write_bytes(gzip.compress(
+                json.dumps({'etag': etag, 'content': content}).encode('utf-8'), compresslevel=1))
+        except OSError as e:
+            logger.warning(f"Could not cache ETag for {url}: {e}")
+
+    def _http_session(self) -> requests.Session:
+        """
+        Get the shared HTTP session, creating it on first use
+
+        Returns:
+            requests.Session with a connection pool sized for the fetch workers
+        """
+        with self._cache_lock:
+            if self._session is None:
+                self._session = requests.Session()
+                self._session.headers['User-Agent'] = 'autonomous-agent-context-fetcher'
+                # Retry dropped connections and transient 5xx answers briefly
+                retries = Retry(total=2, backoff_factor=0.3,
+                                status_forcelist=(500, 502, 503, 504))
+                self._session.mount('https://', HTTPAdapter(
+                    pool_connections=4, pool_maxsize=8, max_retries=retries))
+            return self._session
+
+    def clear_cache(self):
+        """
+        Forget all memoized fetch results
+
+        For long-lived processes that reuse one fetcher after the working
+        tree or history has moved on. On-disk GitHub files are keyed by
+        commit SHA and stay valid, so they are kept.
+        """
+        with self._cache_lock:
+            self._file_cache.clear()
+            self._github_cache.clear()
+            self._etags.clear()
+            self._git_log_cache.clear()
+            self._commit_cache.clear()
+            self._line_index_cache.clear()
+            self._tracked = None
+
+    def close(self):
+        """Release pooled HTTP connections and the git cat-file process"""
+        with self._cache_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+        with self._cat_file_lock:
+            self._stop_cat_file()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def _cache_put(self, cache: Dict, key, value) -> None:
+        """
+        Insert into a bounded in-memory cache, evicting the oldest entry
+
+        Args:
+            cache: Cache dict to update
+            key: Cache key
+            value: Value to store
+        """
+        with self._cache_lock:
+            cache.pop(key, None)
+            if len(cache) >= CACHE_MAX_ENTRIES:
+                cache.pop(next(iter(cache)))
+            cache[key] = value
+
+    def _github_cache_file(self, cache_key: tuple) -> Optional[Path]:
+        """
+        Get the on-disk location for a cached GitHub raw file
+
+        Args:
+            cache_key: (github_repo, commit_sha, path) tuple
+
+        Returns:
+            Path under cache_dir, or None if disk caching is disabled
+        """
+        if not self.cache_dir:
+            return None
+        repo, sha, path = cache_key
+        name = hashlib.blake2b(f"{repo}\0{path}".encode('utf-8'), digest_size=16).hexdigest()
+        return self.cache_dir / sha / f"{name}.gz"
+
+    def _load_github_cached(self, cache_key: tuple) -> Optional[str]:
+        """
+        Look up a GitHub raw file in memory, then on disk
+
+        Args:
+            cache_key: (github_repo, commit_sha, path) tuple
+
+        Returns:
+            Cached content, or None on a miss
+        """
+        content = self._github_cache.get(cache_key)
+        if content is not None:
+            return content
+
+        cache_file = self._github_cache_file(cache_key)
+        if cache_file is None:
+            return None
+        try:
+            content = gzip.decompress(cache_file.read_bytes()).decode('utf-8')
+        except (OSError, EOFError, UnicodeDecodeError):
+            return None
+
+        logger.info(f"Using cached GitHub file: {cache_key[2]} @ {cache_key[1][:8]}")
+        self._cache_put(self._github_cache, cache_key, content)
+        return content
+
+    def _store_github_cached(self, cache_key: tuple, content: str) -> None:
+        """
+        Remember a fetched GitHub raw file in memory and on disk
+
+        Only the most recent GITHUB_CACHE_MAX_SHAS commit directories are
+        kept on disk. Failures are logged and otherwise ignored.
+
+        Args:
+            cache_key: (github_repo, commit_sha, path) tuple
+            content: File content
+        """
+        self._cache_put(self._github_cache, cache_key, content)
+
+        cache_file = self._github_cache_file(cache_key)
+        if cache_file is None:
+            return
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            # Source text compresses several-fold even at the fastest level
+            cache_file.write_bytes(gzip.compress(content.encode('utf-8'), compresslevel=1))
+
+            sha_dirs = sorted((d for d in self.cache_dir.iterdir()
+                               if d.is_dir() and not d.name.startswith('_')),
+                              key=lambda d: d.stat().st_mtime, reverse=True)
+            for stale in sha_dirs[GITHUB_CACHE_MAX_SHAS:]:
+                shutil.rmtree(stale, ignore_errors=True)
+        except OSError as e:
+            logger.warning(f"Could not cache GitHub file {cache_key[2]}: {e}")
+
     def _fetch_log_excerpt(self, search_term: str, reason: str) -> Dict:
         """
         Fetch excerpt from build log based on search term
@@ -248,42 +956,52 @@ class ContextFetcher:
             Dict with git log or error
         """
         try:
+            # Inside the try: a non-string target from the LLM (list, dict)
+            # is unhashable and must become a per-request error
+            cached = self._git_log_cache.get(target)
+            if cached:
+                return dict(cached, reason=reason)
+
             if target == 'recent_with_diffs':
                 # Get last 5 commits with diffs (most useful for debugging)
                 cmd = ['git', 'log', '-5', '--pretty=format:%h|%an|%ar|%s', '--stat']
             elif target == 'all':
-                # Get last 10 commits (summary only)
-                cmd = ['git', 'log', '--oneline', '-10']
+                # Get last 10 commits (summary only), NUL/unit-separator
+                # delimited so fields parse unambiguously
+                cmd = ['git', 'log', '-z', '--format=%H%x1f%s%x1f%an%x1f%ct', '-10']
             else:
                 # Get last 5 commits for specific file with diffs
                 cmd = ['git', 'log', '-5', '--pretty=format:%h|%an|%ar|%s', '--stat', '--', target]
 
-            result = subprocess.run(
-                cmd,
-                cwd=self.repo_root,
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+            returncode, stdout, stderr = self._run_git(cmd)
 
-            if result.returncode == 0:
-                return {
+            if returncode == 0:
+                fulfilled = {
                     'type': 'git_log',
                     'target': target,
                     'reason': reason,
                     'status': 'success',
-                    'content': result.stdout,
+                    'content': stdout,
                     'metadata': {
-                        'commits_shown': min(5 if 'recent' in target else 10, result.stdout.count('\n'))
+                        'commits_shown': min(5 if 'recent' in target else 10, stdout.count('\n'))
                     }
                 }
+                if target == 'all':
+                    commits = self._parse_git_log_records(stdout)
+                    fulfilled['commits'] = commits
+                    fulfilled['content'] = ''.join(
+                        f"{c['sha'][:7]} {c['subject']} ({c['author']})\n" for c in commits
+                    )
+                    fulfilled['metadata']['commits_shown'] = len(commits)
+                self._cache_put(self._git_log_cache, target, fulfilled)
+                return fulfilled
             else:
                 return {
                     'type': 'git_log',
                     'target': target,
                     'reason': reason,
                     'status': 'error',
-                    'content': f"Git command failed: {result.stderr}"
+                    'content': f"Git command failed: {stderr}"
                 }
 
         except Exception as e:
@@ -295,6 +1013,159 @@ class ContextFetcher:
                 'content': f"Error fetching git log: {e}"
             }
 
+    def _run_git(self, cmd: List[str], timeout: int = 10) -> Tuple[int, str, str]:
+        """
+        Run a read-only git command in the repository
+
+        Output is captured as bytes and decoded once, skipping text-mode
+        newline translation. The C locale avoids git's locale setup and
+        GIT_OPTIONAL_LOCKS=0 stops it taking the index lock to refresh stat
+        info, which read-only commands do not need.
+
+        Args:
+            cmd: Full command, starting with 'git'
+            timeout: Seconds before the command is killed
+
+        Returns:
+            Tuple of (returncode, stdout, stderr)
+        """
+        result = subprocess.run(
+            cmd,
+            cwd=self.repo_root,
+            capture_output=True,
+            timeout=timeout,
+            env={**os.environ, 'LC_ALL': 'C', 'GIT_OPTIONAL_LOCKS': '0'}
+        )
+        return (result.returncode,
+                result.stdout.decode('utf-8', errors='replace'),
+                result.stderr.decode('utf-8', errors='replace'))
+
+    @staticmethod
+    def _parse_git_log_records(output: str) -> List[Dict]:
+        """
+        Parse ``git log -z --format=%H%x1f%s%x1f%an%x1f%ct`` output
+
+        Args:
+            output: Raw git log stdout
+
+        Returns:
+            List of commit dicts with sha, subject, author and timestamp
+        """
+        commits = []
+        for record in output.split('\0'):
+            fields = record.strip('\n').split('\x1f')
+            if len(fields) != 4:
+                continue
+            sha, subject, author, timestamp = fields
+            commits.append({
+                'sha': sha,
+                'subject': subject,
+                'author': author,
+                'timestamp': int(timestamp)
+            })
+        return commits
+
+    def _fetch_git_logs_batched(self, requests: List[Dict],
+                                per_file: int = 5) -> Dict[int, Dict]:
+        """
+        Fetch history for several file-targeted git_log requests at once
+
+        Runs a single ``git log --numstat`` over all requested paths and
+        splits the commits back out per path, instead of one git process and
+        one history walk per file. The commit window doubles (32 -> 64 -> 128)
+        only while some path is still short of ``per_file`` commits.
+
+        Args:
+            requests: List of request dicts from LLM
+            per_file: Commits to keep for each path
+
+        Returns:
+            Dict mapping request index -> fulfilled request. Requests left out
+            (fewer than two file paths, git failed, or a path still short of
+            per_file commits at the window cap) go through _fetch_git_log
+            individually.
+        """
+        # Only plain path strings are batched; anything else the LLM sent
+        # goes through _fetch_git_log, which reports it as a request error
+        indices = [
+            i for i, req in enumerate(requests)
+            if req.get('type') == 'git_log'
+            and isinstance(req.get('target'), str)
+            and req['target'] not in ('all', 'recent_with_diffs')
+            and req['target'] not in self._git_log_cache
+        ]
+        # git prints '/'-separated paths on every platform, Windows included
+        targets = {requests[i]['target']: posixpath.normpath(requests[i]['target'].replace('\\', '/'))
+                   for i in indices}
+        if len(targets) < 2:
+            return {}
+
+        window = 32
+        while True:
+            cmd = [
+                'git', 'log', f'-{window}', '--no-renames', '--relative', '--numstat',
+                '--pretty=format:%x1e%h|%an|%ar|%s', '--'
+            ] + sorted(set(targets.values()))
+            try:
+                returncode, stdout, _ = self._run_git(cmd)
+            except Exception as e:
+                logger.warning(f"Batched git log failed, fetching per file: {e}")
+                return {}
+            if returncode != 0:
+                return {}
+
+            commits = []
+            for block in stdout.split('\x1e')[1:]:
+                header, _, stats = block.partition('\n')
+                files = [line.split('\t', 2) for line in stats.splitlines() if line.count('\t') >= 2]
+                commits.append((header, files))
+
+            per_target = {}
+            for target, norm in targets.items():
+                prefix = '' if norm == '.' else norm.rstrip('/') + '/'
+                entries = []
+                for header, files in commits:
+                    touched = [f for f in files if f[2] == norm or f[2].startswith(prefix)]
+                    if touched:
+                        entries.append((header, touched))
+                        if len(entries) == per_file:
+                            break
+                per_target[target] = entries
+
+            if (len(commits) < window or window >= 128
+                    or all(len(e) == per_file for e in per_target.values())):
+                break
+            window *= 2
+
+        # History not exhausted at the window cap: paths still short of
+        # per_file commits fall back to their own git log -5 -- <path>
+        exhausted = len(commits) < window
+
+        fulfilled = {}
+        for i in indices:
+            target = requests[i]['target']
+            entries = per_target[target]
+            if len(entries) < per_file and not exhausted:
+                continue
+            lines = []
+            for header, touched in entries:
+                lines.append(header)
+                lines.extend(f" {path} | +{added} -{deleted}" for added, deleted, path in touched)
+                lines.append('')
+            fulfilled[i] = {
+                'type': 'git_log',
+                'target': target,
+                'reason': requests[i].get('reason', ''),
+                'status': 'success',
+                'content': '\n'.join(lines),
+                'metadata': {
+                    'commits_shown': len(entries)
+                }
+            }
+            self._cache_put(self._git_log_cache, target, fulfilled[i])
+
+        return fulfilled
+
     def get_recent_commits_with_context(self, branch: str, limit: int = 5) -> str:
         """
         Get recent commits on branch with full context
@@ -307,43 +1178,89 @@ class ContextFetcher:
             Formatted commit history with diffs
         """
         try:
-            # Deepen shallow clone to get proper history
-            # This fixes the issue where fetch-depth=1 causes git log --stat
-            # to show ALL files as additions since there's no parent commit
-            deepen_cmd = ['git', 'fetch', '--deepen=10']
-            subprocess.run(
-                deepen_cmd,
-                cwd=self.repo_root,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            # Note: We don't fail if deepen fails - it might already be deep enough
+            self._ensure_history_depth(branch, limit)
 
             # Get commits with full details
-            cmd = [
-                'git', 'log', f'-{limit}',
-                '--pretty=format:---COMMIT---%n%H%n%an <%ae>%n%ar%n%s%n%b',
-                '--stat',
-                branch
-            ]
-
-            result = subprocess.run(
-                cmd,
-                cwd=self.repo_root,
-                capture_output=True,
-                text=True,
-                timeout=15
+            returncode, stdout, stderr = self._git_log_raw(
+                branch, limit, '---COMMIT---%n%H%n%an <%ae>%n%ar%n%s%n%b',
+                extra_args=('--stat',), timeout=15
             )
 
-            if result.returncode == 0:
-                return result.stdout
+            if returncode == 0:
+                return stdout
             else:
-                return f"Error fetching commits: {result.stderr}"
+                return f"Error fetching commits: {stderr}"
 
         except Exception as e:
             return f"Error: {e}"
 
+    def _git_log_raw(self, branch: str, limit: int, format_spec: str,
+                     extra_args: Tuple[str, ...] = (), timeout: int = 10) -> Tuple[int, str, str]:
+        """
+        Run ``git log`` over a branch, reusing output from earlier calls
+
+        Successful output is cached per (branch, limit, format, extra args),
+        so the history helpers fork git at most once per query in a run.
+
+        Args:
+            branch: Branch or revision to log
+            limit: Maximum number of commits
+            format_spec: Value for --pretty=format:
+            extra_args: Additional git log options (e.g. --stat)
+            timeout: Seconds before git is killed
+
+        Returns:
+            Tuple of (returncode, stdout, stderr)
+        """
+        key = (branch, limit, format_spec, extra_args)
+        cached = self._commit_cache.get(key)
+        if cached is not None:
+            return 0, cached, ''
+
+        returncode, stdout, stderr = self._run_git(
+            ['git', 'log', f'-{limit}', f'--pretty=format:{format_spec}', *extra_args, branch],
+            timeout=timeout
+        )
+        if returncode == 0:
+            self._cache_put(self._commit_cache, key, stdout)
+        return returncode, stdout, stderr
+
+    def _ensure_history_depth(self, branch: str, limit: int):
+        """
+        Deepen a shallow clone once, if it lacks the history we need
+
+        This fixes the issue where fetch-depth=1 causes git log --stat to
+        show ALL files as additions since there's no parent commit. The
+        network fetch (up to 30s) is skipped for full clones, when the last
+        ``limit`` commits already have parents, and after the first attempt.
+
+        Args:
+            branch: Branch name
+            limit: Number of commits that will be shown
+        """
+        if self._deepened:
+            return
+        self._deepened = True
+
+        returncode, stdout, _ = self._run_git(['git', 'rev-parse', '--is-shallow-repository'])
+        if returncode == 0 and stdout.strip() == 'false':
+            return
+
+        returncode, stdout, _ = self._run_git(
+            ['git', 'rev-list', '--count', f'--max-count={limit + 1}', branch]
+        )
+        if returncode == 0 and int(stdout.strip() or 0) > limit:
+            return
+
+        subprocess.run(
+            ['git', 'fetch', '--deepen=10'],
+            cwd=self.repo_root,
+            capture_output=True,
+            text=True,
+            timeout=30
+        )
+        # Note: We don't fail if deepen fails - it might already be deep enough
+
     def analyze_regression(self, branch: str, current_commit: str) -> Dict:
         """
         Analyze if this is a regression (was working, now broken)
@@ -360,24 +1277,12 @@ class ContextFetcher:
             # This would require integration with CI/GitHub Actions API
             # For now, analyze recent commits
 
-            cmd = [
-                'git', 'log', '-10', '--oneline',
-                '--pretty=format:%h|%s',
-                branch
-            ]
-
-            result = subprocess.run(
-                cmd,
-                cwd=self.repo_root,
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+            returncode, stdout, _ = self._git_log_raw(branch, 10, '%h|%s')
 
-            if result.returncode != 0:
+            if returncode != 0:
                 return {'is_regression': 'unknown', 'reason': 'Could not fetch git history'}
 
-            commits = result.stdout.strip().split('\n')
+            commits = stdout.strip().split('\n')
 
             # Simple heuristic: if we have recent commits, this might be a regression
             if len(commits) > 1:
@@ -414,25 +1319,28 @@ class ContextFetcher:
         sections = []
 
         for i, req in enumerate(fulfilled_requests, 1):
-            req_type = req['type']
-            target = req['target']
             status = req['status']
             content = req['content']
 
-            section = f"### Request {i}: {req_type.title()} - `{target}`\n\n"
-            section += f"**Reason:** {req.get('reason', 'N/A')}\n"
-            section += f"**Status:** {status}\n\n"
+            # Collect parts and join once; content can be a whole file
+            parts = [
+                f"### Request {i}: {req['type'].title()} - `{req['target']}`\n\n",
+                f"**Reason:** {req.get('reason', 'N/A')}\n",
+                f"**Status:** {status}\n\n"
+            ]
 
             if status == 'success':
                 # Add metadata if available
                 if 'metadata' in req:
-                    meta = req['metadata']
-                    section += f"**Metadata:** {meta}\n\n"
+                    parts.append(f"**Metadata:** {req['metadata']}\n\n")
 
-                section += f"**Content:**\n```\n{content}\n```\n"
+                # Fence must be longer than any backtick run in the content
+                fence = '`' * max(3, max(map(len, _BACKTICK_RUN_RE.findall(content)), default=0) + 1)
+                # Separate parts so content is copied only by the final join
+                parts.extend(("**Content:**\n", fence, "\n", content, "\n", fence, "\n"))
             else:
-                section += f"**Error:** {content}\n"
+                parts.append(f"**Error:** {content}\n")
 
-            sections.append(section)
+            sections.append("".join(parts))
 
         return "\n".join(sections)
@@ -8,10 +8,46 @@ import logging
 import time
 import json
 from typing import Optional, Dict, List
-from datetime import datetime, timedelta
+
+try:
+    from .ttl_cache import TTLCache
+except ImportError:
+    from ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+_COORD_BODY_TMPL = """## Multi-Flavor Build Coordination
+
+**Commit:** {sha}
+**First Failing Flavor:** {flavor}
+**Created:** {ts}
+
+### Status
+
+🔄 **{flavor}** is analyzing the failure and will create a fix
+
+### Failing Flavors
+
+- ✗ **{flavor}** - Analyzing with LLM
+
+---
+*This issue coordinates workflows to avoid duplicate LLM analysis.*
+*Other flavors will wait for the fix from {flavor}.*
+"""
+
+_FLAVOR_COMMENT_TMPL = """### Flavor: {flavor}
+
+**Status:** ✗ Also failed on this commit
+**Time:** {ts}
+
+Waiting for fix from primary flavor...
+"""
+
+
+def _utc_timestamp() -> str:
+    """Current UTC time as an ISO 8601 string with second precision"""
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+
 
 class FlavorCoordinator:
     """
@@ -38,14 +74,31 @@ class FlavorCoordinator:
         self.github_repo = github_repo
         self.repo = repo
         self.commit_sha = commit_sha
+        self.commit_prefix = commit_sha[:8]
         self.coordination_label = "autonomous-coordination"
+        self._flavor_count_cache: Dict[int, int] = {}
+
+        # Issue objects already fetched or created by this coordinator, keyed
+        # by number, so follow-up calls on the same issue skip get_issue()
+        self._issues: Dict[int, object] = {}
+
+        # Coordination issue found for (repo, commit_sha). Only hits are
+        # cached: a miss must be re-checked while racing flavors create it
+        self._search_cache = TTLCache(ttl=60)
+
+        # Repository methods, probed once; None when github_repo is a
+        # stand-in without them (tests, dry runs)
+        self._create_label = getattr(github_repo, 'create_label', None)
+        self._get_issues = getattr(github_repo, 'get_issues', None)
+        self._create_issue = getattr(github_repo, 'create_issue', None)
 
     def should_analyze(self, flavor: str) -> Dict:
         """
         Determine if this flavor should run LLM analysis
 
         Simple logic: If another workflow is already fixing this commit, skip.
-        Otherwise, create an issue and proceed with analysis.
+        Otherwise, take the commit lock, create an issue and proceed with
+        analysis.
 
         Args:
             flavor: Build flavor (e.g., "linux-x64", "windows", "jetson-arm64")
@@ -53,7 +106,7 @@ class FlavorCoordinator:
         Returns:
             Dict with decision and coordination info
         """
-        logger.info(f"Checking coordination for flavor={flavor}, commit={self.commit_sha[:8]}")
+        logger.info(f"Checking coordination for flavor={flavor}, commit={self.commit_prefix}")
 
         # Check for existing coordination issue for this commit
         existing_issue = self._find_coordination_issue()
@@ -71,30 +124,41 @@ class FlavorCoordinator:
                 'issue_number': existing_issue['number']
             }
         else:
-            # No one is working on this commit yet - we're first!
+            # No one is working on this commit yet - claim it atomically
+            lock = self._acquire_commit_lock()
+            if lock is False:
+                # Lost the race: the winner is creating the issue right now
+                for _ in range(3):
+                    existing_issue = self._find_coordination_issue()
+                    if existing_issue:
+                        logger.info(f"Lost coordination race to issue #{existing_issue['number']}")
+                        self._add_flavor_to_issue(existing_issue['number'], flavor)
+                        return {
+                            'should_analyze': False,
+                            'reason': 'another_workflow_fixing',
+                            'issue_number': existing_issue['number']
+                        }
+
+                # Lock left over from an earlier run whose issue is closed
+                logger.info(f"Lock for {self.commit_prefix} has no open issue - treating as stale")
+
             logger.info(f"No existing coordination issue - we're first to work on this")
             issue = self._create_coordination_issue(flavor)
-
-            # Double-check: Did someone else create one at the same time?
-            time.sleep(1)
-            existing_issue = self._find_coordination_issue()
-
-            if existing_issue and existing_issue['number'] != issue['number']:
-                if existing_issue['number'] < issue['number']:
-                    logger.info(f"Race condition: found lower-numbered issue #{existing_issue['number']}")
-                    # Close our duplicate
-                    try:
-                        if hasattr(self.github_repo, 'get_issue'):
-                            our_issue = self.github_repo.get_issue(issue['number'])
-                            our_issue.edit(state='closed')
-                            our_issue.create_comment(f"Duplicate of #{existing_issue['number']}")
-                    except Exception as e:
-                        logger.error(f"Failed to close duplicate: {e}")
-
+            if not issue['number']:
+                # No issue for others to find; don't leave them a lock
+                self.release_commit_lock()
+            elif lock is not True:
+                # A stale or unavailable lock no longer serialises flavors, so
+                # several may have got here at once: the lowest-numbered issue wins
+                winner = self._lowest_coordination_issue()
+                if winner is not None and winner.number < issue['number']:
+                    logger.info(f"Race condition: found lower-numbered issue #{winner.number}")
+                    self._close_duplicate_issue(issue['number'], winner.number)
+                    self._add_flavor_to_issue(winner.number, flavor)
                     return {
                         'should_analyze': False,
                         'reason': 'another_workflow_fixing',
-                        'issue_number': existing_issue['number']
+                        'issue_number': winner.number
                     }
 
             return {
@@ -103,42 +167,86 @@ class FlavorCoordinator:
                 'issue_number': issue['number']
             }
 
+    def _acquire_commit_lock(self) -> Optional[bool]:
+        """Claim this commit by creating its lock label
+
+        Label names are unique per repository, so creation is an atomic
+        compare-and-set: exactly one flavor succeeds and the rest get
+        HTTP 422. Other errors (rate limit, 5xx, no permission to create
+        labels) leave the outcome unknown; the caller then dedupes issues
+        after creating its own.
+
+        Returns:
+            True if this flavor holds the lock, False if another flavor
+            does, None if the lock could not be taken
+        """
+        if self._create_label is None:
+            return True
+
+        try:
+            self._create_label(name=f"lock-{self.commit_prefix}", color="ededed")
+            return True
+        except Exception as e:
+            if getattr(e, 'status', None) == 422:
+                return False
+            logger.error(f"Error creating coordination lock label: {e}")
+            return None
+
+    def release_commit_lock(self):
+        """Delete this commit's lock label so a later run can claim it again"""
+        get_label = getattr(self.github_repo, 'get_label', None)
+        if get_label is None:
+            return
+
+        try:
+            get_label(f"lock-{self.commit_prefix}").delete()
+            logger.info(f"Released coordination lock for {self.commit_prefix}")
+        except Exception as e:
+            logger.warning(f"Could not release coordination lock for {self.commit_prefix}: {e}")
+
     def _find_coordination_issue(self) -> Optional[Dict]:
         """Find existing coordination issue for this commit
 
-        Retries with small delays to handle GitHub API eventual consistency.
+        Filters server-side by the per-commit label that
+        _create_coordination_issue attaches, so GitHub returns at most the
+        one matching issue instead of every open coordination issue. Uses
+        Repository.get_issues() rather than the search API, whose index
+        lags behind newly created issues. Retries once to cover API lag.
         """
+        cache_key = (self.repo, self.commit_sha)
+        cached = self._search_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
-            # Use Repository.get_issues() instead of search API
-            # Try multiple times with small delays to handle API lag
-            if hasattr(self.github_repo, 'get_issues'):
-                commit_prefix = self.commit_sha[:8]
-
-                # Try up to 3 times with increasing delays
-                for attempt in range(3):
-                    # Get open issues with coordination label
-                    issues = self.github_repo.get_issues(
+            if self._get_issues is not None:
+                commit_label = f"commit-{self.commit_prefix}"
+
+                for attempt in range(2):
+                    issues = self._get_issues(
                         state='open',
-                        labels=[self.coordination_label]
+                        labels=[self.coordination_label, commit_label]
                     )
 
-                    # Filter for our commit SHA in title
-                    for issue in issues:
-                        if commit_prefix in issue.title:
-                            logger.info(f"Found existing coordination issue: #{issue.number} (attempt {attempt+1})")
-                            # Convert to dict for easier handling
-                            return {
-                                'number': issue.number,
-                                'title': issue.title,
-                                'body': issue.body,
-                                'url': issue.html_url
-                            }
+                    issue = next(iter(issues), None)
+                    if issue is not None:
+                        self._issues[issue.number] = issue
+                        logger.info(f"Found existing coordination issue: #{issue.number} (attempt {attempt+1})")
+                        # Convert to dict for easier handling
+                        found = {
+                            'number': issue.number,
+                            'title': issue.title,
+                            'body': issue.body,
+                            'url': issue.html_url
+                        }
+                        self._search_cache.put(cache_key, found)
+                        return found
 
                     # If not found and not last attempt, wait a bit
-                    if attempt < 2:
-                        time.sleep(0.5 * (attempt + 1))  # 0.5s, then 1s
+                    if attempt == 0:
+                        time.sleep(0.5)
 
-                logger.info(f"No coordination issue found for commit {self.commit_sha[:8]} after 3 attempts")
+                logger.info(f"No coordination issue found for commit {self.commit_prefix} after 2 attempts")
                 return None
             else:
                 # Fallback for testing
@@ -149,37 +257,47 @@ class FlavorCoordinator:
             logger.error(f"Error finding coordination issue: {e}")
             return None
 
-    def _create_coordination_issue(self, flavor: str) -> Dict:
-        """Create coordination issue for this commit"""
-        title = f"🤖 Build Coordination: {self.commit_sha[:8]}"
-
-        body = f"""## Multi-Flavor Build Coordination
-
-**Commit:** {self.commit_sha}
-**First Failing Flavor:** {flavor}
-**Created:** {datetime.utcnow().isoformat()}
-
-### Status
+    def _lowest_coordination_issue(self):
+        """Lowest-numbered open coordination issue for this commit, or None"""
+        if self._get_issues is None:
+            return None
 
-🔄 **{flavor}** is analyzing the failure and will create a fix
+        # Give flavors racing through the stale-lock path time to create theirs
+        time.sleep(1)
+        try:
+            issues = self._get_issues(
+                state='open',
+                labels=[self.coordination_label, f"commit-{self.commit_prefix}"]
+            )
+            return min(issues, key=lambda i: i.number, default=None)
+        except Exception as e:
+            logger.error(f"Error listing coordination issues: {e}")
+            return None
 
-### Failing Flavors
+    def _close_duplicate_issue(self, issue_number: int, winner_number: int):
+        """Close our coordination issue in favour of the winner's"""
+        try:
+            our_issue = self._issues.get(issue_number) or self.github_repo.get_issue(issue_number)
+            our_issue.edit(state='closed')
+            our_issue.create_comment(f"Duplicate of #{winner_number}")
+        except Exception as e:
+            logger.error(f"Failed to close duplicate: {e}")
 
-- ✗ **{flavor}** - Analyzing with LLM
+    def _create_coordination_issue(self, flavor: str) -> Dict:
+        """Create coordination issue for this commit"""
+        title = f"🤖 Build Coordination: {self.commit_prefix}"
 
----
-*This issue coordinates workflows to avoid duplicate LLM analysis.*
-*Other flavors will wait for the fix from {flavor}.*
-"""
+        body = _COORD_BODY_TMPL.format(sha=self.commit_sha, flavor=flavor, ts=_utc_timestamp())
 
         try:
             # Create real GitHub issue for coordination
-            if hasattr(self.github_repo, 'create_issue'):
-                issue = self.github_repo.create_issue(
+            if self._create_issue is not None:
+                issue = self._create_issue(
                     title=title,
                     body=body,
-                    labels=[self.coordination_label, f"commit-{self.commit_sha[:8]}"]
+                    labels=[self.coordination_label, f"commit-{self.commit_prefix}"]
                 )
+                self._issues[issue.number] = issue
                 logger.info(f"Created coordination issue: #{issue.number}")
                 return {'number': issue.number, 'title': title, 'url': issue.html_url}
             else:
@@ -195,13 +313,7 @@ class FlavorCoordinator:
     def _add_flavor_to_issue(self, issue_number: int, flavor: str):
         """Add this flavor to existing coordination issue"""
         try:
-            comment = f"""### Flavor: {flavor}
-
-**Status:** ✗ Also failed on this commit
-**Time:** {datetime.utcnow().isoformat()}
-
-Waiting for fix from primary flavor...
-"""
+            comment = _FLAVOR_COMMENT_TMPL.format(flavor=flavor, ts=_utc_timestamp())
 
             # In real implementation:
             # self.github_repo.get_issue(issue_number).create_comment(comment)
@@ -235,11 +347,24 @@ Other flavors can now:
 
         except Exception as e:
             logger.error(f"Error marking fix complete: {e}")
+        finally:
+            self.release_commit_lock()
 
     def _count_waiting_flavors(self, issue_number: int) -> int:
         """Count how many flavors are waiting"""
-        # Parse issue to count flavors
-        return 6  # Dummy: 7 total - 1 that fixed = 6 saved
+        if issue_number in self._flavor_count_cache:
+            return self._flavor_count_cache[issue_number]
+
+        try:
+            # One paginated listing; each waiting flavor left a "### Flavor:" comment
+            issue = self._issues.get(issue_number) or self.github_repo.get_issue(issue_number)
+            count = sum(1 for c in issue.get_comments() if (c.body or '').startswith('### Flavor:'))
+        except Exception as e:
+            logger.warning(f"Could not count waiting flavors on issue #{issue_number}: {e}")
+            return 0
+
+        self._flavor_count_cache[issue_number] = count
+        return count
 
 
 class CoordinationConfig:
@@ -7,11 +7,49 @@ to provide rich context for LLM analysis.
 import logging
 import os
 import subprocess
+import tempfile
+import threading
+from collections import deque
 from typing import Dict, List, Optional
 from pathlib import Path
 
+import requests
+from requests.adapters import HTTPAdapter
+
+# Faster JSON decoder for REST responses, with stdlib fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from .ttl_cache import TTLCache
+except ImportError:
+    from ttl_cache import TTLCache
+
 logger = logging.getLogger(__name__)
 
+# Job logs can be tens of MB; keep only the head, the tail and the lines
+# around each error/warning instead of the whole text
+LOG_HEAD_CHARS = 64 * 1024
+LOG_TAIL_CHARS = 64 * 1024
+LOG_CONTEXT_LINES = 20
+MAX_CONTEXT_WINDOWS = 20
+
+# Seconds to wait for `gh run view --log` before killing it
+LOG_FETCH_TIMEOUT = 60
+
+# Seconds a successful fetch is reused before GitHub is asked again
+RESULT_CACHE_TTL = 60
+
+
+def _json_body(response):
+    """Decode a JSON response body, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
 # Workflow file mapping: determines which workflow files to fetch based on the main workflow
 WORKFLOW_FILE_MAP = {
     'CI-Win-NoCUDA': ['CI-Win-NoCUDA.yml', 'build-test-win.yml'],
@@ -29,7 +67,8 @@ class GitHubContextFetcher:
     Fetches GitHub-specific context: job annotations, workflow files, run details
     """
 
-    def __init__(self, github_token: str, github_repo: str, run_id: str = None):
+    def __init__(self, github_token: str, github_repo: str, run_id: str = None,
+                 github_client=None, repo=None):
         """
         Initialize GitHub context fetcher
 
@@ -37,14 +76,30 @@ class GitHubContextFetcher:
             github_token: GitHub API token
             github_repo: Repository in format "owner/repo"
             run_id: Workflow run ID
+            github_client: Existing PyGithub client to share (optional)
+            repo: Existing PyGithub Repository for github_repo (optional)
         """
         self.github_token = github_token
         self.github_repo = github_repo
         self.run_id = run_id
         self.github = None
 
-        # Initialize PyGithub if we have credentials
-        if github_token and github_repo:
+        # Session for REST endpoints PyGithub does not cover, created on
+        # first use so repeated calls reuse one keep-alive connection
+        self._session = None
+
+        # Successful fetch results, keyed by (kind, run_id or workflow, flavor)
+        self._result_cache = TTLCache(ttl=RESULT_CACHE_TTL)
+
+        # Materialized run.jobs() per workflow run id; each listing is paginated
+        self._jobs_cache: Dict[int, list] = {}
+
+        if github_client is not None and repo is not None:
+            # Reuse the caller's client and connection pool; skips a get_repo call
+            self.github = github_client
+            self.repo = repo
+        elif github_token and github_repo:
+            # Initialize PyGithub if we have credentials
             try:
                 from github import Github
                 self.github = Github(github_token)
@@ -53,6 +108,77 @@ class GitHubContextFetcher:
             except Exception as e:
                 logger.warning(f"Could not initialize GitHub API: {e}")
 
+    def _http_session(self):
+        """
+        Get the shared authenticated session for raw REST calls
+
+        GETs are retried with exponential backoff on 5xx and rate limiting.
+        PyGithub's GithubRetry is used when available since it also
+        recognises GitHub's secondary rate limit (403 with Retry-After).
+
+        Returns:
+            requests.Session with GitHub auth and Accept headers set
+        """
+        if self._session is None:
+            try:
+                from github.GithubRetry import GithubRetry
+                retry = GithubRetry(total=5, backoff_factor=0.5)
+            except ImportError:
+                from urllib3.util.retry import Retry
+                retry = Retry(total=5, backoff_factor=0.5,
+                              status_forcelist=(429, 500, 502, 503, 504))
+
+            self._session = requests.Session()
+            self._session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16,
+                                                        max_retries=retry))
+            self._session.headers.update({
+                'Authorization': f'token {self.github_token}',
+                'Accept': 'application/vnd.github.v3+json'
+            })
+        return self._session
+
+    def close(self):
+        """Release pooled HTTP connections"""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def _cached(self, key: tuple, fetch) -> Dict:
+        """
+        Return a recent successful result for key, or call fetch()
+
+        Only 'success' results are kept so errors and missing data are
+        retried on the next call.
+        """
+        result = self._result_cache.get(key)
+        if result is None:
+            result = fetch()
+            if result.get('status') == 'success':
+                self._result_cache.put(key, result)
+        return result
+
+    def _get_jobs(self, run) -> list:
+        """
+        Get the jobs of a workflow run, listing them from GitHub only once
+
+        Args:
+            run: PyGithub WorkflowRun
+
+        Returns:
+            List of WorkflowJob objects
+        """
+        jobs = self._jobs_cache.get(run.id)
+        if jobs is None:
+            jobs = self._jobs_cache[run.id] = list(run.jobs())
+        return jobs
+
     def fetch_job_annotations(self, build_flavor: str = None) -> Dict:
         """
         Fetch job annotations (errors, warnings) from GitHub Actions
@@ -63,6 +189,11 @@ class GitHubContextFetcher:
         Returns:
             Dict with annotations and job details
         """
+        return self._cached(('annotations', self.run_id, build_flavor),
+                            lambda: self._fetch_job_annotations(build_flavor))
+
+    def _fetch_job_annotations(self, build_flavor: str = None) -> Dict:
+        """Uncached fetch_job_annotations"""
         if not self.github or not self.run_id:
             return {
                 'status': 'unavailable',
@@ -75,7 +206,7 @@ class GitHubContextFetcher:
             run = self.repo.get_workflow_run(int(self.run_id))
 
             # Get all jobs in the run
-            jobs = run.jobs()
+            jobs = self._get_jobs(run)
 
             # Find the job that matches build_flavor (if provided)
             target_job = None
@@ -107,31 +238,31 @@ class GitHubContextFetcher:
 
             # Fetch annotations using GitHub API
             # Note: PyGithub doesn't have direct annotation support, use REST API
-            import requests
-
-            headers = {
-                'Authorization': f'token {self.github_token}',
-                'Accept': 'application/vnd.github.v3+json'
-            }
-
-            # Get check runs for this job
-            # GitHub uses check runs to store annotations
-            check_runs_url = f"https://api.github.com/repos/{self.github_repo}/commits/{run.head_sha}/check-runs"
-            response = requests.get(check_runs_url, headers=headers)
-            response.raise_for_status()
-
-            check_runs_data = response.json()
-
-            # Find check run matching our job
+            session = self._http_session()
+
+            # GitHub uses check runs to store annotations. Each job links to
+            # its own check run, so only fall back to listing every check run
+            # on the commit when that link is missing.
+            check_run_url = getattr(target_job, 'check_run_url', None)
+            if not check_run_url:
+                check_runs_url = f"https://api.github.com/repos/{self.github_repo}/commits/{run.head_sha}/check-runs"
+                response = session.get(check_runs_url)
+                response.raise_for_status()
+
+                check_runs_data = _json_body(response)
+
+                # Find check run matching our job
+                for check_run in check_runs_data.get('check_runs', []):
+                    if check_run['name'] == target_job.name:
+                        check_run_url = check_run['url']
+                        break
+
+            # Get annotations for this check run
             annotations = []
-            for check_run in check_runs_data.get('check_runs', []):
-                if check_run['name'] == target_job.name:
-                    # Get annotations for this check run
-                    annotations_url = check_run['url'] + '/annotations'
-                    ann_response = requests.get(annotations_url, headers=headers)
-                    ann_response.raise_for_status()
-                    annotations = ann_response.json()
-                    break
+            if check_run_url:
+                ann_response = session.get(check_run_url + '/annotations')
+                ann_response.raise_for_status()
+                annotations = _json_body(ann_response)
 
             return {
                 'status': 'success',
@@ -161,6 +292,11 @@ class GitHubContextFetcher:
         Returns:
             Dict with job logs and error annotations
         """
+        return self._cached(('logs', self.run_id, build_flavor),
+                            lambda: self._fetch_job_logs(build_flavor))
+
+    def _fetch_job_logs(self, build_flavor: str = None) -> Dict:
+        """Uncached fetch_job_logs"""
         if not self.run_id:
             return {
                 'status': 'unavailable',
@@ -233,55 +369,132 @@ class GitHubContextFetcher:
                     'error_count': 0
                 }
 
-            # Fetch logs for this job using gh CLI
+            # Fetch logs for this job using gh CLI, scanning them as they
+            # stream in rather than buffering the whole log first
             log_cmd = ['gh', 'run', 'view', '--job', target_job_id, '--log']
 
-            log_result = subprocess.run(
+            # stderr goes to a file: a pipe read only after stdout ends can
+            # fill up and block gh while we are still reading stdout
+            err_file = tempfile.TemporaryFile()
+            log_proc = subprocess.Popen(
                 log_cmd,
-                capture_output=True,
+                stdout=subprocess.PIPE,
+                stderr=err_file,
                 text=True,
-                timeout=60
+                errors='replace'
             )
+            timed_out = threading.Event()
 
-            if log_result.returncode != 0:
-                return {
-                    'status': 'error',
-                    'error': f'Failed to fetch logs: {log_result.stderr}',
-                    'logs': '',
-                    'error_annotations': [],
-                    'error_count': 0
-                }
+            def kill_on_timeout():
+                timed_out.set()
+                log_proc.kill()
 
-            logs = log_result.stdout
+            timer = threading.Timer(LOG_FETCH_TIMEOUT, kill_on_timeout)
+            timer.start()
 
             # Extract error annotations from logs with step names
             # Track current step using ##[debug]Starting: step-name markers
             error_lines = []
             current_step = "UNKNOWN STEP"
+            logs_size = 0
+            head_parts = []
+            head_size = 0
+            tail = deque()
+            tail_size = 0
+            recent = deque(maxlen=LOG_CONTEXT_LINES)
+            windows = []
+            window = None
+            window_remaining = 0
+            window_end = -LOG_CONTEXT_LINES - 1
+            lineno = 0
 
-            for line in logs.split('\n'):
-                # Track step transitions
-                if '##[debug]Starting:' in line:
-                    # Extract step name from "##[debug]Starting: Step Name"
-                    parts = line.split('##[debug]Starting:', 1)
-                    if len(parts) == 2:
-                        current_step = parts[1].strip()
-
-                # Capture errors/warnings with current step name
-                if '##[error]' in line or '##[warning]' in line:
-                    # Replace "UNKNOWN STEP" in the line with actual step name
-                    if '\tUNKNOWN STEP\t' in line and current_step != "UNKNOWN STEP":
-                        line = line.replace('\tUNKNOWN STEP\t', f'\t{current_step}\t', 1)
-                    error_lines.append(line.strip())
+            try:
+                for line in log_proc.stdout:
+                    lineno += 1
+                    logs_size += len(line)
+                    if head_size < LOG_HEAD_CHARS:
+                        head_parts.append(line)
+                        head_size += len(line)
+                    tail.append(line)
+                    tail_size += len(line)
+                    while tail_size - len(tail[0]) >= LOG_TAIL_CHARS:
+                        tail_size -= len(tail.popleft())
+
+                    # Track step transitions
+                    if '##[debug]Starting:' in line:
+                        # Extract step name from "##[debug]Starting: Step Name"
+                        parts = line.split('##[debug]Starting:', 1)
+                        if len(parts) == 2:
+                            current_step = parts[1].strip()
+
+                    # Capture errors/warnings with current step name
+                    is_error = '##[error]' in line or '##[warning]' in line
+                    if is_error:
+                        # Replace "UNKNOWN STEP" in the line with actual step name
+                        if '\tUNKNOWN STEP\t' in line and current_step != "UNKNOWN STEP":
+                            line = line.replace('\tUNKNOWN STEP\t', f'\t{current_step}\t', 1)
+                        error_lines.append(line.strip())
+
+                    # Keep LOG_CONTEXT_LINES lines either side of each error.
+                    # An error whose leading context reaches the previous
+                    # window extends that window, so no line appears twice.
+                    if window is not None:
+                        window.append(line)
+                        window_end = lineno
+                        window_remaining -= 1
+                        if is_error:
+                            window_remaining = LOG_CONTEXT_LINES
+                        elif window_remaining == 0:
+                            window = None
+                    elif is_error:
+                        before = [l for n, l in recent if n > window_end]
+                        if lineno - window_end <= LOG_CONTEXT_LINES + 1:
+                            window = windows[-1]
+                        elif len(windows) < MAX_CONTEXT_WINDOWS:
+                            window = []
+                            windows.append(window)
+                        if window is not None:
+                            window.extend(before)
+                            window.append(line)
+                            window_end = lineno
+                            window_remaining = LOG_CONTEXT_LINES
+                    recent.append((lineno, line))
+
+                returncode = log_proc.wait()
+                err_file.seek(0)
+                stderr = err_file.read().decode('utf-8', errors='replace')
+            finally:
+                timer.cancel()
+                if log_proc.poll() is None:
+                    log_proc.kill()
+                    log_proc.wait()
+                log_proc.stdout.close()
+                err_file.close()
+
+            if timed_out.is_set():
+                raise subprocess.TimeoutExpired(log_cmd, LOG_FETCH_TIMEOUT)
+
+            if returncode != 0:
+                return {
+                    'status': 'error',
+                    'error': f'Failed to fetch logs: {stderr}',
+                    'logs': '',
+                    'error_annotations': [],
+                    'error_count': 0
+                }
 
             return {
                 'status': 'success',
                 'job_name': target_job_name,
                 'job_id': target_job_id,
-                'logs_size': len(logs),
+                'logs_size': logs_size,
                 'error_annotations': error_lines,
                 'error_count': len(error_lines),
-                'full_logs': logs  # Include full logs for context
+                # Bounded slices of the log for context; the tail is empty
+                # when the head already holds the whole log
+                'full_logs_head': ''.join(head_parts),
+                'full_logs_tail': ''.join(tail)[-LOG_TAIL_CHARS:] if logs_size > head_size else '',
+                'context_windows': [''.join(w) for w in windows]
             }
 
         except subprocess.TimeoutExpired:
@@ -302,86 +515,6 @@ class GitHubContextFetcher:
                 'error_count': 0
             }
 
-    def fetch_job_logs_old(self, build_flavor: str = None) -> Dict:
-        """
-        OLD METHOD: Fetch raw logs from failed job using PyGithub
-        Keeping for reference, but prefer gh CLI method above
-
-        Args:
-            build_flavor: Build flavor to identify which job failed
-
-        Returns:
-            Dict with job logs
-        """
-        if not self.github or not self.run_id:
-            return {
-                'status': 'unavailable',
-                'reason': 'GitHub API not initialized or no run_id provided',
-                'logs': ''
-            }
-
-        try:
-            # Get workflow run
-            run = self.repo.get_workflow_run(int(self.run_id))
-
-            # Get all jobs in the run
-            jobs = run.jobs()
-
-            # Find the job that matches build_flavor
-            target_job = None
-            for job in jobs:
-                if build_flavor and build_flavor.lower() in job.name.lower():
-                    target_job = job
-                    break
-                elif not build_flavor and job.conclusion == 'failure':
-                    target_job = job
-                    break
-
-            if not target_job:
-                return {
-                    'status': 'no_failed_job',
-                    'reason': f'No failed job found for flavor: {build_flavor}',
-                    'logs': ''
-                }
-
-            # Fetch logs using GitHub API
-            import requests
-
-            headers = {
-                'Authorization': f'token {self.github_token}',
-                'Accept': 'application/vnd.github.v3+json'
-            }
-
-            logs_url = f"https://api.github.com/repos/{self.github_repo}/actions/jobs/{target_job.id}/logs"
-            response = requests.get(logs_url, headers=headers, allow_redirects=True)
-            response.raise_for_status()
-
-            logs = response.text
-
-            # Extract error annotations from logs (lines with ##[error])
-            error_lines = []
-            for line in logs.split('\n'):
-                if '##[error]' in line or '##[warning]' in line:
-                    error_lines.append(line)
-
-            return {
-                'status': 'success',
-                'job_name': target_job.name,
-                'job_id': target_job.id,
-                'logs_size': len(logs),
-                'error_annotations': error_lines,
-                'error_count': len(error_lines),
-                'full_logs': logs  # Include full logs for context
-            }
-
-        except Exception as e:
-            logger.error(f"Error fetching job logs: {e}", exc_info=True)
-            return {
-                'status': 'error',
-                'error': str(e),
-                'logs': ''
-            }
-
     def fetch_workflow_files(self, workflow_name: str) -> Dict:
         """
         Fetch ONLY relevant workflow YAML files for context using workflow map
@@ -392,6 +525,11 @@ class GitHubContextFetcher:
         Returns:
             Dict with workflow file contents (only relevant files)
         """
+        return self._cached(('workflow_files', workflow_name, None),
+                            lambda: self._fetch_workflow_files(workflow_name))
+
+    def _fetch_workflow_files(self, workflow_name: str) -> Dict:
+        """Uncached fetch_workflow_files"""
         # Use workflow map to determine which files to fetch
         files_to_fetch = WORKFLOW_FILE_MAP.get(workflow_name, [workflow_name + '.yml'])
 
@@ -493,24 +631,26 @@ class GitHubContextFetcher:
         if annotations_data['status'] != 'success':
             return f"*Annotations unavailable: {annotations_data.get('reason', 'unknown')}*"
 
-        output = f"**Job:** {annotations_data['job_name']}\n"
-        output += f"**Conclusion:** {annotations_data['job_conclusion']}\n"
-        output += f"**Annotation Count:** {annotations_data['annotation_count']}\n\n"
+        parts = [
+            f"**Job:** {annotations_data['job_name']}\n",
+            f"**Conclusion:** {annotations_data['job_conclusion']}\n",
+            f"**Annotation Count:** {annotations_data['annotation_count']}\n\n"
+        ]
 
         if not annotations_data['annotations']:
-            output += "*No annotations found*\n"
-            return output
+            parts.append("*No annotations found*\n")
+            return "".join(parts)
 
-        output += "**Annotations:**\n\n"
+        parts.append("**Annotations:**\n\n")
         for i, ann in enumerate(annotations_data['annotations'], 1):
-            output += f"{i}. **{ann.get('annotation_level', 'unknown').upper()}**"
+            parts.append(f"{i}. **{ann.get('annotation_level', 'unknown').upper()}**")
             if 'path' in ann:
-                output += f" in `{ann['path']}`"
+                parts.append(f" in `{ann['path']}`")
                 if 'start_line' in ann:
-                    output += f":{ann['start_line']}"
-            output += f"\n   {ann.get('message', 'No message')}\n\n"
+                    parts.append(f":{ann['start_line']}")
+            parts.append(f"\n   {ann.get('message', 'No message')}\n\n")
 
-        return output
+        return "".join(parts)
 
     def format_error_lines_for_prompt(self, logs_data: Dict) -> str:
         """
@@ -528,20 +668,22 @@ class GitHubContextFetcher:
         if not logs_data.get('error_annotations'):
             return "*No error annotations found in logs*"
 
-        output = f"**Job:** {logs_data['job_name']}\n"
-        output += f"**Error Count:** {logs_data['error_count']}\n\n"
-        output += "**GitHub Annotations (Errors/Warnings):**\n\n```\n"
+        parts = [
+            f"**Job:** {logs_data['job_name']}\n",
+            f"**Error Count:** {logs_data['error_count']}\n\n",
+            "**GitHub Annotations (Errors/Warnings):**\n\n```\n"
+        ]
 
         # Show first 20 error lines
         for line in logs_data['error_annotations'][:20]:
-            output += line + "\n"
+            parts.extend((line, "\n"))
 
         if logs_data['error_count'] > 20:
-            output += f"\n... ({logs_data['error_count'] - 20} more errors)\n"
+            parts.append(f"\n... ({logs_data['error_count'] - 20} more errors)\n")
 
-        output += "```\n"
+        parts.append("```\n")
 
-        return output
+        return "".join(parts)
 
     def format_workflow_files_for_prompt(self, workflow_data: Dict) -> str:
         """
@@ -556,13 +698,15 @@ class GitHubContextFetcher:
         if workflow_data['status'] != 'success':
             return f"*Workflow files unavailable: {workflow_data.get('reason', 'unknown')}*"
 
-        output = f"**Workflow Files ({workflow_data['file_count']} files):**\n\n"
+        parts = [f"**Workflow Files ({workflow_data['file_count']} files):**\n\n"]
 
         for name, file_info in workflow_data['workflow_files'].items():
-            output += f"### {name}\n"
-            output += f"**Path:** `{file_info['path']}`\n\n"
-            output += "```yaml\n"
-            output += file_info['content']
-            output += "\n```\n\n"
-
-        return output
+            parts.extend((
+                f"### {name}\n",
+                f"**Path:** `{file_info['path']}`\n\n",
+                "```yaml\n",
+                file_info['content'],
+                "\n```\n\n"
+            ))
+
+        return "".join(parts)
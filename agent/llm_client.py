@@ -23,6 +23,10 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Investigation prompt sections before this heading are the same on every
+# turn (repo info, annotations, workflow files, error excerpt)
+_INVESTIGATION_CACHE_SPLIT = "## Recent Git History"
+
 
 @dataclass
 class LLMResponse:
@@ -644,7 +648,7 @@ Applied fix after {attempt_count} attempt(s). The final changeset resolves the i
                     max_tokens=self.config.MAX_TOKENS_PER_TURN,
                     temperature=self.config.TEMPERATURE,
                     system=template['system'],
-                    messages=[{"role": "user", "content": prompt}]
+                    messages=[{"role": "user", "content": self._cached_user_content(prompt)}]
                 )
 
                 response_text = response.content[0].text
@@ -783,6 +787,31 @@ Applied fix after {attempt_count} attempt(s). The final changeset resolves the i
         logger.warning(f"Investigation ended after {turn} turns, forcing best guess")
         return self._force_best_guess(model, error_context, conversation_history)
 
+    def _cached_user_content(self, prompt: str) -> List[Dict]:
+        """
+        Split an investigation prompt into content blocks with a cache breakpoint
+
+        The system prompt and the leading sections of the user prompt are
+        identical on every investigation turn. Marking the end of that stable
+        block ephemeral lets later turns read the whole prefix from the
+        prompt cache; the system prompt alone is below the API's minimum
+        cacheable length.
+
+        Args:
+            prompt: Full user prompt from _build_investigation_prompt()
+
+        Returns:
+            User content blocks for messages.create()
+        """
+        head, marker, tail = prompt.partition(_INVESTIGATION_CACHE_SPLIT)
+        if not marker:
+            return [{"type": "text", "text": prompt}]
+
+        return [
+            {"type": "text", "text": head, "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": marker + tail}
+        ]
+
     def _build_investigation_prompt(self, error_context: Dict, previous_attempts: List[Dict],
                                    conversation_history: List[Dict], turn: int,
                                    github_repo: str = '', branch: str = '', commit_sha: str = '',
@@ -836,25 +865,22 @@ Applied fix after {attempt_count} attempt(s). The final changeset resolves the i
             git_history = "*(Git history shown on first turn)*"
             regression_text = "*(Regression analysis shown on first turn)*"
 
-        # Format GitHub annotations (only on first turn)
-        if turn == 1:
-            github_annotations_data = error_context.get('github_annotations', {})
-            github_workflow_files_data = error_context.get('github_workflow_files', {})
+        # Format GitHub annotations on every turn: they belong to the stable
+        # prompt prefix that later turns read from the prompt cache
+        github_annotations_data = error_context.get('github_annotations', {})
+        github_workflow_files_data = error_context.get('github_workflow_files', {})
 
-            # Import github_context module for formatting
-            try:
-                from github_context import GitHubContextFetcher
-                gh_fetcher = GitHubContextFetcher(github_token='', github_repo='')  # Just for formatting methods
-
-                github_annotations_text = gh_fetcher.format_error_lines_for_prompt(github_annotations_data)
-                github_workflow_files_text = gh_fetcher.format_workflow_files_for_prompt(github_workflow_files_data)
-            except Exception as e:
-                logger.warning(f"Could not format GitHub context: {e}")
-                github_annotations_text = "*GitHub annotations unavailable*"
-                github_workflow_files_text = "*Workflow files unavailable*"
-        else:
-            github_annotations_text = "*(GitHub annotations shown on first turn)*"
-            github_workflow_files_text = "*(Workflow files shown on first turn)*"
+        # Import github_context module for formatting
+        try:
+            from github_context import GitHubContextFetcher
+            gh_fetcher = GitHubContextFetcher(github_token='', github_repo='')  # Just for formatting methods
+
+            github_annotations_text = gh_fetcher.format_error_lines_for_prompt(github_annotations_data)
+            github_workflow_files_text = gh_fetcher.format_workflow_files_for_prompt(github_workflow_files_data)
+        except Exception as e:
+            logger.warning(f"Could not format GitHub context: {e}")
+            github_annotations_text = "*GitHub annotations unavailable*"
+            github_workflow_files_text = "*Workflow files unavailable*"
 
         # Build prompt
         metadata_dict = error_context.get('metadata_dict', {})
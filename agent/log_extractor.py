@@ -40,6 +40,12 @@ class SmartLogExtractor:
         """
         self.max_excerpt_lines = max_excerpt_lines
 
+        # One alternation over all lowercased markers: a single C-level scan
+        # per line instead of lowering and testing each marker in Python
+        self._error_marker_re = re.compile(
+            '|'.join(re.escape(marker.lower()) for marker in self.ERROR_MARKERS)
+        )
+
     def extract_relevant_error(self, log_path: str, platform: str = "unknown",
                               github_annotations: Dict = None) -> Dict:
         """
@@ -115,9 +121,9 @@ class SmartLogExtractor:
         Returns:
             Index of last error, or None if not found
         """
+        search = self._error_marker_re.search
         for i in range(len(lines) - 1, -1, -1):
-            line_lower = lines[i].lower()
-            if any(marker.lower() in line_lower for marker in self.ERROR_MARKERS):
+            if search(lines[i].lower()):
                 return i
         return None
 
@@ -194,7 +200,7 @@ class SmartLogExtractor:
             "error_type": error_type,
             "metadata_dict": metadata,  # Keep dict for programmatic access
             "metadata": self._format_metadata(metadata),  # Formatted string for prompt
-            "excerpt_lines": len(content.splitlines())
+            "excerpt_lines": content.count('\n') + (1 if content and not content.endswith('\n') else 0)
         }
 
     def _format_metadata(self, metadata: Dict) -> str:
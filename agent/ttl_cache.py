@@ -0,0 +1,34 @@
+"""
+TTL Cache
+
+Small in-process cache shared by the GitHub-facing helpers.
+"""
+import time
+from typing import Dict
+
+
+class TTLCache:
+    """Small dict cache whose entries expire after a fixed number of seconds"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: Dict[tuple, tuple] = {}
+
+    def get(self, key: tuple):
+        """Return the cached value, or None if missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        return value
+
+    def put(self, key: tuple, value) -> None:
+        """Store a value for ttl seconds"""
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self, key: tuple) -> None:
+        """Drop a cached value"""
+        self._entries.pop(key, None)
@@ -28,6 +28,14 @@ class TestAgentInitialization:
         agent = AutonomousAgent(config=config, mock_mode=True)
         assert agent.config.model.SONNET_MAX_ATTEMPTS == 2
 
+    def test_mock_git_still_resolves_head(self):
+        """Mocked Git inside a checkout should still know the commit SHA"""
+        import subprocess
+        head = subprocess.check_output(['git', 'rev-parse', 'HEAD'], text=True).strip()
+
+        agent = AutonomousAgent(mock_mode=True)
+        assert agent.context_fetcher.commit_sha == head
+
     def test_mock_mode_uses_mock_clients(self):
         """Mock mode should use mock LLM and Git clients"""
         agent = AutonomousAgent(mock_mode=True)
@@ -53,6 +61,93 @@ class TestAgentAttemptDetection:
         assert attempt == 3
 
 
+class TestAgentCommitCache:
+    """Test per-run caching of branch commits"""
+
+    def test_branch_commits_fetched_once(self):
+        """Repeated helpers on the same branch should share one fetch"""
+        agent = AutonomousAgent(mock_mode=True)
+        calls = []
+        original = agent.git.get_commits_on_branch
+
+        def counting_get_commits(branch_name):
+            calls.append(branch_name)
+            return original(branch_name)
+
+        agent.git.get_commits_on_branch = counting_get_commits
+
+        assert agent._detect_attempt_from_commits("123") == 1
+        assert agent._detect_human_commits("123") is False
+        assert len(agent._load_previous_attempts("123")) == 1
+        assert calls == ["autonomous-fix-123"]
+
+
+class TestAgentInvestigationCache:
+    """Test on-disk caching of LLM investigations"""
+
+    def _make_agent(self, tmp_path):
+        config = AgentConfig.default()
+        config.INVESTIGATION_CACHE_DIR = str(tmp_path / 'cache')
+        agent = AutonomousAgent(config=config, mock_mode=True)
+        agent.mock_llm = False
+        agent.context_fetcher.commit_sha = 'abc123'
+        return agent
+
+    def test_cached_investigation_round_trip(self, tmp_path):
+        """Stored investigation should be returned for the same error"""
+        from agent.llm_client import LLMResponse
+
+        agent = self._make_agent(tmp_path)
+        error_context = {'error_type': 'test_failure', 'error_excerpt': 'boom'}
+        key = agent._investigation_cache_key(error_context, attempt=1)
+
+        assert agent._load_cached_investigation(key) is None
+
+        agent._store_cached_investigation(key, LLMResponse(
+            analysis={'root_cause': 'x', 'confidence': 0.9},
+            fix={'description': 'fix', 'files_to_change': [{'path': 'a.py', 'action': 'delete'}]},
+            skill_update={},
+            raw_response='',
+            model_used='claude-sonnet-4-5',
+            tokens_used=100
+        ))
+        cached = agent._load_cached_investigation(key)
+
+        assert cached.fix['description'] == 'fix'
+        assert cached.tokens_used == 0
+
+    def test_failed_investigation_not_cached(self, tmp_path):
+        """Best-guess or low-confidence results must not be replayed later"""
+        from agent.llm_client import LLMResponse
+
+        agent = self._make_agent(tmp_path)
+        key = agent._investigation_cache_key({'error_excerpt': 'boom'}, attempt=1)
+
+        agent._store_cached_investigation(key, LLMResponse(
+            analysis={'root_cause': 'Unable to determine with high confidence', 'confidence': 0.5},
+            fix={'description': 'Unable to propose fix', 'files_to_change': []},
+            skill_update={},
+            raw_response='Budget exhausted',
+            model_used='claude-sonnet-4-5',
+            tokens_used=0
+        ))
+        agent._store_cached_investigation(key, LLMResponse(
+            analysis={'root_cause': 'x', 'confidence': 0.6},
+            fix={'description': 'guess', 'files_to_change': [{'path': 'a.py', 'action': 'delete'}]},
+            skill_update={},
+            raw_response='',
+            model_used='claude-sonnet-4-5',
+            tokens_used=100
+        ))
+
+        assert agent._load_cached_investigation(key) is None
+
+    def test_no_cache_in_mock_llm_mode(self):
+        """Mock LLM runs must not read or write the cache"""
+        agent = AutonomousAgent(mock_mode=True)
+        assert agent._investigation_cache_key({'error_excerpt': 'boom'}, attempt=1) is None
+
+
 class TestAgentFailureLogParsing:
     """Test failure log parsing"""
 
@@ -0,0 +1,591 @@
+"""
+Focused unit tests for ContextFetcher
+
+Tests file fetching as requested by the LLM during investigation.
+"""
+import os
+import gzip
+import subprocess
+import pytest
+import requests
+from pathlib import Path
+from agent.context_fetcher import ContextFetcher
+
+
+class FakeResponse:
+    """Minimal stand-in for requests.Response"""
+
+    def __init__(self, status_code, content=b'', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.reason = 'Not Found' if status_code == 404 else 'OK'
+        self.closed = False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(response=self)
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSession:
+    """Records GET requests and replays canned responses"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def get(self, url, headers=None, timeout=None, stream=False):
+        self.calls.append((url, dict(headers or {})))
+        return self.responses.pop(0)
+
+    def close(self):
+        pass
+
+
+class TestFetchFile:
+    """Test local file fetching"""
+
+    def test_fetch_existing_file(self, tmp_path):
+        """Test fetching a file inside the repository"""
+        (tmp_path / 'main.py').write_text('print("hello")\n')
+        fetcher = ContextFetcher(str(tmp_path))
+
+        result = fetcher._fetch_file('main.py', 'test')
+
+        assert result['status'] == 'success'
+        assert result['content'] == 'print("hello")\n'
+        assert result['metadata']['lines'] == 1
+
+    def test_fetch_missing_file(self, tmp_path):
+        """Test missing files report not_found"""
+        fetcher = ContextFetcher(str(tmp_path))
+
+        result = fetcher._fetch_file('missing.py', 'test')
+
+        assert result['status'] == 'not_found'
+
+    def test_fetch_rejects_path_traversal(self, tmp_path):
+        """Test paths outside the repository are rejected"""
+        repo = tmp_path / 'repo'
+        repo.mkdir()
+        (tmp_path / 'secret.txt').write_text('secret')
+        fetcher = ContextFetcher(str(repo))
+
+        result = fetcher._fetch_file('../secret.txt', 'test')
+
+        assert result['status'] == 'error'
+        assert 'secret' not in result['content']
+
+    def test_fetch_rejects_sibling_with_shared_prefix(self, tmp_path):
+        """Test a sibling directory whose name extends the root is rejected"""
+        repo = tmp_path / 'repo'
+        repo.mkdir()
+        (tmp_path / 'repo2').mkdir()
+        (tmp_path / 'repo2' / 'secret.txt').write_text('secret')
+        fetcher = ContextFetcher(str(repo))
+
+        result = fetcher._fetch_file('../repo2/secret.txt', 'test')
+
+        assert result['status'] == 'error'
+
+    def test_fetch_binary_file(self, tmp_path):
+        """Test files with NUL bytes are reported as binary, not decoded"""
+        (tmp_path / 'blob.dat').write_bytes(b'\x7fELF\x00\x01\x02')
+        (tmp_path / 'logo.png').write_bytes(b'not even read')
+        fetcher = ContextFetcher(str(tmp_path))
+
+        sniffed = fetcher._fetch_file('blob.dat', 'test')
+        by_extension = fetcher._fetch_file('logo.png', 'test')
+
+        assert sniffed['status'] == 'binary'
+        assert '7f454c46' in sniffed['content']
+        assert by_extension['status'] == 'binary'
+
+    def test_tracked_file_skips_path_resolution(self, tmp_path, monkeypatch):
+        """Test files listed by git ls-files are opened without resolve()"""
+        (tmp_path / 'tracked.py').write_text('tracked\n')
+        subprocess.run(['git', 'init', '-q'], cwd=tmp_path, check=True)
+        subprocess.run(['git', 'add', 'tracked.py'], cwd=tmp_path, check=True)
+        fetcher = ContextFetcher(str(tmp_path))
+
+        def fail_resolve(self, *args, **kwargs):
+            raise AssertionError("tracked files should not be resolved")
+
+        monkeypatch.setattr(Path, 'resolve', fail_resolve)
+        result = fetcher._fetch_file('./tracked.py', 'test')
+
+        assert result['status'] == 'success'
+        assert result['content'] == 'tracked\n'
+
+    def test_fetch_too_large(self, tmp_path):
+        """Test files above max_file_size are not returned"""
+        (tmp_path / 'big.txt').write_text('x' * 100)
+        fetcher = ContextFetcher(str(tmp_path), max_file_size=10)
+
+        result = fetcher._fetch_file('big.txt', 'test')
+
+        assert result['status'] == 'too_large'
+
+
+class TestFetchFileRange:
+    """Test line-range fetching for large files"""
+
+    def test_fetch_lines_from_large_file(self, tmp_path):
+        """Test a line range is returned even when the file exceeds the cap"""
+        (tmp_path / 'big.cpp').write_text(''.join(f'line {n}\n' for n in range(1, 1001)))
+        fetcher = ContextFetcher(str(tmp_path), max_file_size=100)
+
+        result = fetcher.fetch_requests([
+            {'type': 'file_range', 'target': {'path': 'big.cpp', 'start': 500, 'end': 502}}
+        ])[0]
+
+        assert result['status'] == 'success'
+        assert result['content'] == 'line 500\nline 501\nline 502\n'
+        assert result['metadata']['total_lines'] == 1000
+
+    def test_range_clamped_to_end_of_file(self, tmp_path):
+        """Test ranges running past the last line are clamped"""
+        (tmp_path / 'short.py').write_text('a\nb\nc')
+        fetcher = ContextFetcher(str(tmp_path))
+
+        result = fetcher._fetch_file_range({'path': 'short.py', 'start': 2, 'end': 10}, 'test')
+
+        assert result['content'] == 'b\nc'
+        assert result['metadata']['end'] == 3
+
+    def test_invalid_range_rejected(self, tmp_path):
+        """Test malformed targets return an error"""
+        fetcher = ContextFetcher(str(tmp_path))
+
+        result = fetcher._fetch_file_range({'path': 'x.py', 'start': 5, 'end': 1}, 'test')
+
+        assert result['status'] == 'error'
+
+
+class TestFileCache:
+    """Test caching of file contents across requests"""
+
+    def test_unchanged_file_served_from_cache(self, tmp_path, monkeypatch):
+        """Test second fetch of an unchanged file does not reopen it"""
+        (tmp_path / 'main.py').write_text('cached\n')
+        fetcher = ContextFetcher(str(tmp_path))
+        fetcher._fetch_file('main.py', 'first')
+
+        def fail_open(*args, **kwargs):
+            raise AssertionError("file should not be re-read")
+
+        monkeypatch.setattr('agent.context_fetcher.os.read', fail_open)
+        result = fetcher._fetch_file('main.py', 'second')
+
+        assert result['status'] == 'success'
+        assert result['content'] == 'cached\n'
+
+    def test_modified_file_is_reread(self, tmp_path):
+        """Test cache is invalidated when the file changes on disk"""
+        target = tmp_path / 'main.py'
+        target.write_text('old\n')
+        fetcher = ContextFetcher(str(tmp_path))
+        fetcher._fetch_file('main.py', 'first')
+
+        target.write_text('new content\n')
+        os.utime(target, ns=(0, 0))
+        result = fetcher._fetch_file('main.py', 'second')
+
+        assert result['content'] == 'new content\n'
+
+    def test_clear_cache_forces_refetch(self, tmp_path, monkeypatch):
+        """Test clear_cache drops memoized results"""
+        (tmp_path / 'main.py').write_text('cached\n')
+        fetcher = ContextFetcher(str(tmp_path))
+        fetcher._fetch_file('main.py', 'first')
+
+        fetcher.clear_cache()
+
+        assert fetcher._file_cache == {}
+        assert fetcher._fetch_file('main.py', 'second')['content'] == 'cached\n'
+
+    def test_file_cache_is_bounded(self, tmp_path, monkeypatch):
+        """Test oldest entries are evicted once the cache is full"""
+        monkeypatch.setattr('agent.context_fetcher.CACHE_MAX_ENTRIES', 2)
+        for name in ('a.py', 'b.py', 'c.py'):
+            (tmp_path / name).write_text(name)
+        fetcher = ContextFetcher(str(tmp_path))
+
+        for name in ('a.py', 'b.py', 'c.py'):
+            fetcher._fetch_file(name, 'test')
+
+        cached = [Path(key).name for key in fetcher._file_cache]
+        assert cached == ['b.py', 'c.py']
+
+    def test_github_raw_persisted_per_sha(self, tmp_path):
+        """Test GitHub files at a fixed SHA are downloaded once across runs"""
+        session = FakeSession(FakeResponse(200, b'remote content\n'))
+        cache_dir = str(tmp_path / 'cache')
+
+        first = ContextFetcher(str(tmp_path), github_repo='org/repo',
+                               commit_sha='abc123', cache_dir=cache_dir)
+        first._session = session
+        assert first._fetch_github_raw('src/x.py', 'test')['content'] == 'remote content\n'
+        assert first._fetch_github_raw('src/x.py', 'test')['status'] == 'success'
+
+        second = ContextFetcher(str(tmp_path), github_repo='org/repo',
+                                commit_sha='abc123', cache_dir=cache_dir)
+        second._session = session
+        result = second._fetch_github_raw('src/x.py', 'test')
+
+        assert result['content'] == 'remote content\n'
+        assert len(session.calls) == 1
+        cached_file, = (tmp_path / 'cache' / 'abc123').iterdir()
+        assert gzip.decompress(cached_file.read_bytes()) == b'remote content\n'
+
+
+class TestGithubRaw:
+    """Test GitHub raw downloads over the shared session"""
+
+    def test_not_modified_reuses_previous_body(self, tmp_path):
+        """Test a 304 answer returns the earlier body"""
+        session = FakeSession(
+            FakeResponse(200, b'main branch file\n', {'ETag': '"v1"'}),
+            FakeResponse(304)
+        )
+        fetcher = ContextFetcher(str(tmp_path))
+        fetcher._session = session
+        url = 'https://raw.githubusercontent.com/org/repo/main/x.py'
+
+        first = fetcher._fetch_github_raw(url, 'test')
+        second = fetcher._fetch_github_raw(url, 'test')
+
+        assert first['content'] == 'main branch file\n'
+        assert second['content'] == 'main branch file\n'
+        assert second['metadata']['revalidated'] is True
+        assert session.calls[0][1]['Accept-Encoding'] == 'gzip'
+        assert session.calls[1][1]['If-None-Match'] == '"v1"'
+
+    def test_session_retries_and_closes(self, tmp_path):
+        """Test the pooled session retries transient errors and is released on exit"""
+        with ContextFetcher(str(tmp_path)) as fetcher:
+            adapter = fetcher._http_session().get_adapter('https://raw.githubusercontent.com/')
+            assert adapter.max_retries.total == 2
+            assert 503 in adapter.max_retries.status_forcelist
+
+        assert fetcher._session is None
+
+    def test_path_at_local_commit_read_from_git(self, tmp_path):
+        """Test a path at a locally available commit is served without HTTP"""
+        def git(*args):
+            return subprocess.run(['git', '-c', 'user.name=t', '-c', 'user.email=t@t', *args],
+                                  cwd=tmp_path, check=True, capture_output=True, text=True).stdout
+
+        git('init', '-q')
+        (tmp_path / 'src').mkdir()
+        (tmp_path / 'src' / 'a.py').write_text('old\n')
+        git('add', '.')
+        git('commit', '-q', '-m', 'add a')
+        sha = git('rev-parse', 'HEAD').strip()
+        (tmp_path / 'src' / 'a.py').write_text('working tree edit\n')
+
+        with ContextFetcher(str(tmp_path), github_repo='org/repo', commit_sha=sha) as fetcher:
+            fetcher._session = FakeSession(FakeResponse(200, b'from github\n'))
+
+            first = fetcher._fetch_github_raw('src/a.py', 'test')
+            second = fetcher._fetch_github_raw('src/missing.py', 'test')
+
+            assert first['status'] == 'success'
+            assert first['content'] == 'old\n'
+            assert second['content'] == 'from github\n'
+            assert len(fetcher._session.calls) == 1
+        assert fetcher._cat_file is None
+
+    def test_oversized_download_aborts(self, tmp_path):
+        """Test a body past max_file_size is rejected without reading it all"""
+        fetcher = ContextFetcher(str(tmp_path), max_file_size=100000)
+        response = FakeResponse(200, b'x' * 300000)
+        fetcher._session = FakeSession(response)
+
+        result = fetcher._fetch_github_raw('https://raw.githubusercontent.com/org/repo/main/big.bin', 'test')
+
+        assert result['status'] == 'too_large'
+        assert response.closed is True
+
+    def test_etag_survives_across_fetchers(self, tmp_path):
+        """Test a new fetcher sharing the cache dir revalidates instead of downloading"""
+        cache_dir = str(tmp_path / 'cache')
+        url = 'https://raw.githubusercontent.com/org/repo/main/x.py'
+
+        first = ContextFetcher(str(tmp_path), cache_dir=cache_dir)
+        first._session = FakeSession(FakeResponse(200, b'body\n', {'ETag': '"v2"'}))
+        first._fetch_github_raw(url, 'test')
+
+        second = ContextFetcher(str(tmp_path), cache_dir=cache_dir)
+        second._session = FakeSession(FakeResponse(304))
+        result = second._fetch_github_raw(url, 'test')
+
+        assert result['content'] == 'body\n'
+        assert result['metadata']['revalidated'] is True
+        assert second._session.calls[0][1]['If-None-Match'] == '"v2"'
+
+    def test_missing_file_reports_not_found(self, tmp_path):
+        """Test HTTP 404 maps to not_found"""
+        fetcher = ContextFetcher(str(tmp_path))
+        fetcher._session = FakeSession(FakeResponse(404))
+
+        result = fetcher._fetch_github_raw('https://raw.githubusercontent.com/o/r/main/x', 'test')
+
+        assert result['status'] == 'not_found'
+        assert result['content'] == 'HTTP 404: Not Found'
+
+
+class TestFetchRequests:
+    """Test batch fetching of LLM requests"""
+
+    def test_results_keep_request_order(self, tmp_path):
+        """Test concurrent fetches are returned in request order"""
+        for name in ('a.py', 'b.py', 'c.py'):
+            (tmp_path / name).write_text(name)
+        fetcher = ContextFetcher(str(tmp_path))
+
+        results = fetcher.fetch_requests([
+            {'type': 'file', 'target': 'c.py'},
+            {'type': 'bogus', 'target': 'x'},
+            {'type': 'file', 'target': 'a.py'},
+            {'type': 'file', 'target': 'b.py'},
+        ])
+
+        assert [r['target'] for r in results] == ['c.py', 'x', 'a.py', 'b.py']
+        assert [r['status'] for r in results] == ['success', 'error', 'success', 'success']
+
+    def test_duplicate_requests_fetched_once(self, tmp_path, monkeypatch):
+        """Test identical requests in one batch share a single fetch"""
+        (tmp_path / 'a.py').write_text('a\n')
+        fetcher = ContextFetcher(str(tmp_path))
+        calls = []
+        original = fetcher._handlers['file']
+
+        def counting_fetch(target, reason):
+            calls.append(target)
+            return original(target, reason)
+
+        monkeypatch.setitem(fetcher._handlers, 'file', counting_fetch)
+
+        results = fetcher.fetch_requests([
+            {'type': 'file', 'target': 'a.py', 'reason': 'first'},
+            {'type': 'file', 'target': 'a.py', 'reason': 'second'},
+        ])
+
+        assert calls == ['a.py']
+        assert [r['reason'] for r in results] == ['first', 'second']
+        assert results[1]['content'] == 'a\n'
+
+    def test_git_log_requests_share_one_git_call(self, tmp_path, monkeypatch):
+        """Test per-file git_log requests are answered from a single git log"""
+        def git(*args):
+            subprocess.run(['git', '-c', 'user.name=t', '-c', 'user.email=t@t', *args],
+                           cwd=tmp_path, check=True, capture_output=True)
+
+        git('init', '-q')
+        (tmp_path / 'a.py').write_text('a\n')
+        git('add', 'a.py')
+        git('commit', '-q', '-m', 'add a')
+        (tmp_path / 'b.py').write_text('b\n')
+        git('add', 'b.py')
+        git('commit', '-q', '-m', 'add b')
+
+        calls = []
+        real_run = subprocess.run
+
+        def counting_run(cmd, *args, **kwargs):
+            calls.append(cmd)
+            return real_run(cmd, *args, **kwargs)
+
+        monkeypatch.setattr('agent.context_fetcher.subprocess.run', counting_run)
+        fetcher = ContextFetcher(str(tmp_path))
+
+        results = fetcher.fetch_requests([
+            {'type': 'git_log', 'target': 'b.py'},
+            {'type': 'git_log', 'target': 'a.py'},
+        ])
+
+        assert len(calls) == 1
+        assert [r['target'] for r in results] == ['b.py', 'a.py']
+        assert 'add b' in results[0]['content'] and 'add a' not in results[0]['content']
+        assert 'add a' in results[1]['content'] and 'add b' not in results[1]['content']
+        assert results[1]['metadata']['commits_shown'] == 1
+
+        # Later turns asking for the same history reuse the earlier result
+        again = fetcher.fetch_requests([{'type': 'git_log', 'target': 'a.py'}])
+        assert again[0]['content'] == results[1]['content']
+        assert len(calls) == 1
+
+
+    def test_git_log_batch_matches_backslash_paths(self, tmp_path):
+        """Test Windows-style targets still match git's '/'-separated paths"""
+        def git(*args):
+            subprocess.run(['git', '-c', 'user.name=t', '-c', 'user.email=t@t', *args],
+                           cwd=tmp_path, check=True, capture_output=True)
+
+        git('init', '-q')
+        (tmp_path / 'src').mkdir()
+        (tmp_path / 'src' / 'a.py').write_text('a\n')
+        (tmp_path / 'b.py').write_text('b\n')
+        git('add', '.')
+        git('commit', '-q', '-m', 'add files')
+        fetcher = ContextFetcher(str(tmp_path))
+
+        results = fetcher._fetch_git_logs_batched([
+            {'type': 'git_log', 'target': 'src\\a.py'},
+            {'type': 'git_log', 'target': 'b.py'},
+        ])
+
+        assert results[0]['metadata']['commits_shown'] == 1
+        assert 'add files' in results[0]['content']
+
+    def test_git_log_batch_falls_back_past_window_cap(self, tmp_path):
+        """Test a path with no commits in the capped window gets its own git log"""
+        def git(*args):
+            subprocess.run(['git', '-c', 'user.name=t', '-c', 'user.email=t@t', *args],
+                           cwd=tmp_path, check=True, capture_output=True)
+
+        git('init', '-q')
+        (tmp_path / 'old.py').write_text('old\n')
+        git('add', 'old.py')
+        git('commit', '-q', '-m', 'add old')
+        for n in range(130):
+            (tmp_path / 'hot.py').write_text(f'{n}\n')
+            git('add', 'hot.py')
+            git('commit', '-q', '-m', f'hot {n}')
+        fetcher = ContextFetcher(str(tmp_path))
+
+        requests_ = [
+            {'type': 'git_log', 'target': 'hot.py'},
+            {'type': 'git_log', 'target': 'old.py'},
+        ]
+        assert list(fetcher._fetch_git_logs_batched(requests_)) == [0]
+
+        results = fetcher.fetch_requests(requests_)
+
+        assert results[1]['status'] == 'success'
+        assert 'add old' in results[1]['content']
+
+    def test_non_string_git_log_target_is_error(self, tmp_path):
+        """Test a malformed git_log target becomes a request error, not an exception"""
+        fetcher = ContextFetcher(str(tmp_path))
+
+        result = fetcher._fetch_git_log(['a.py'], 'bad target')
+
+        assert result['status'] == 'error'
+
+
+    def test_malformed_git_log_targets_do_not_abort_batch(self, tmp_path):
+        """Test list/None git_log targets are reported per request"""
+        fetcher = ContextFetcher(str(tmp_path))
+
+        results = fetcher.fetch_requests([
+            {'type': 'git_log', 'target': ['a.py', 'b.py']},
+            {'type': 'git_log', 'target': None},
+            {'type': 'git_log', 'target': 'a.py'},
+        ])
+
+        assert len(results) == 3
+        assert results[0]['status'] == 'error'
+        assert results[1]['status'] == 'error'
+
+
+class TestFormatFulfilledRequests:
+    """Test prompt formatting of fetched context"""
+
+    def test_fence_outlasts_backticks_in_content(self, tmp_path):
+        """Test content containing ``` cannot close its own code block"""
+        fetcher = ContextFetcher(str(tmp_path))
+        content = "# Docs\n\n```bash\nmake\n```\n"
+
+        text = fetcher.format_fulfilled_requests([
+            {'type': 'file', 'target': 'README.md', 'status': 'success', 'content': content}
+        ])
+
+        assert f"````\n{content}\n````\n" in text
+
+    def test_plain_content_keeps_triple_fence(self, tmp_path):
+        """Test ordinary content still uses a ``` fence"""
+        fetcher = ContextFetcher(str(tmp_path))
+
+        text = fetcher.format_fulfilled_requests([
+            {'type': 'file', 'target': 'a.py', 'status': 'success', 'content': 'x = `1`'}
+        ])
+
+        assert "```\nx = `1`\n```\n" in text
+
+
+class TestHistoryDepth:
+    """Test shallow-clone deepening before showing recent commits"""
+
+    def test_full_clone_is_not_fetched(self, tmp_path, monkeypatch):
+        """Test no git fetch runs for a non-shallow repository"""
+        subprocess.run(['git', 'init', '-q'], cwd=tmp_path, check=True)
+        subprocess.run(['git', '-c', 'user.name=t', '-c', 'user.email=t@t', 'commit', '-q',
+                        '--allow-empty', '-m', 'first'], cwd=tmp_path, check=True)
+        calls = []
+        real_run = subprocess.run
+
+        def recording_run(cmd, *args, **kwargs):
+            calls.append(cmd[:2])
+            return real_run(cmd, *args, **kwargs)
+
+        monkeypatch.setattr('agent.context_fetcher.subprocess.run', recording_run)
+        fetcher = ContextFetcher(str(tmp_path))
+
+        fetcher.get_recent_commits_with_context('HEAD', limit=2)
+        fetcher.get_recent_commits_with_context('HEAD', limit=2)
+
+        assert ['git', 'fetch'] not in calls
+        assert calls.count(['git', 'rev-parse']) == 1
+
+    def test_history_queries_are_cached(self, tmp_path, monkeypatch):
+        """Test repeated history and regression lookups run git log once each"""
+        subprocess.run(['git', 'init', '-q'], cwd=tmp_path, check=True)
+        for message in ('first', 'second'):
+            subprocess.run(['git', '-c', 'user.name=t', '-c', 'user.email=t@t', 'commit', '-q',
+                            '--allow-empty', '-m', message], cwd=tmp_path, check=True)
+        calls = []
+        real_run = subprocess.run
+
+        def recording_run(cmd, *args, **kwargs):
+            calls.append(cmd[:2])
+            return real_run(cmd, *args, **kwargs)
+
+        monkeypatch.setattr('agent.context_fetcher.subprocess.run', recording_run)
+        fetcher = ContextFetcher(str(tmp_path))
+
+        for _ in range(2):
+            history = fetcher.get_recent_commits_with_context('HEAD', limit=2)
+            regression = fetcher.analyze_regression('HEAD', 'abc')
+
+        assert '---COMMIT---' in history
+        assert regression['is_regression'] == 'likely'
+        assert [c[1] for c in regression['commits']] == ['second', 'first']
+        assert calls.count(['git', 'log']) == 2
+
+
+class TestGitLogParsing:
+    """Test parsing of structured git log output"""
+
+    def test_parse_records_with_awkward_subjects(self):
+        """Test NUL/unit-separator records survive pipes and newlines"""
+        output = ('a' * 40 + '\x1ffix | pipe\x1fAlice\x1f1700000000\0'
+                  + 'b' * 40 + '\x1fsecond\x1fBob Smith\x1f1700000100\0')
+
+        commits = ContextFetcher._parse_git_log_records(output)
+
+        assert [c['subject'] for c in commits] == ['fix | pipe', 'second']
+        assert commits[1]['author'] == 'Bob Smith'
+        assert commits[0]['timestamp'] == 1700000000
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
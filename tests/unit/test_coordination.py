@@ -0,0 +1,220 @@
+"""
+Focused unit tests for FlavorCoordinator
+
+Tests the GitHub issue lookups used to coordinate flavor builds.
+"""
+import re
+import pytest
+from unittest.mock import Mock, patch
+from agent.coordination import FlavorCoordinator
+
+
+COMMIT_SHA = 'abcdef1234567890'
+
+
+def make_issue(number):
+    issue = Mock()
+    issue.number = number
+    issue.title = f"🤖 Build Coordination: {COMMIT_SHA[:8]}"
+    issue.body = ''
+    issue.html_url = f"https://github.com/org/repo/issues/{number}"
+    return issue
+
+
+class TestFindCoordinationIssue:
+    """Test lookup of the coordination issue for a commit"""
+
+    def test_filters_by_commit_label(self):
+        """Test the query asks GitHub for this commit's label only"""
+        github_repo = Mock()
+        github_repo.get_issues.return_value = [make_issue(42)]
+        coordinator = FlavorCoordinator(Mock(), github_repo, 'org/repo', COMMIT_SHA)
+
+        issue = coordinator._find_coordination_issue()
+
+        assert issue['number'] == 42
+        github_repo.get_issues.assert_called_once_with(
+            state='open',
+            labels=['autonomous-coordination', 'commit-abcdef12']
+        )
+
+    @patch('agent.coordination.time.sleep')
+    def test_returns_none_after_retry(self, mock_sleep):
+        """Test a missing issue is retried once before giving up"""
+        github_repo = Mock()
+        github_repo.get_issues.return_value = []
+        coordinator = FlavorCoordinator(Mock(), github_repo, 'org/repo', COMMIT_SHA)
+
+        assert coordinator._find_coordination_issue() is None
+        assert github_repo.get_issues.call_count == 2
+        mock_sleep.assert_called_once_with(0.5)
+
+    @patch('agent.coordination.time.sleep')
+    def test_found_issue_cached_but_misses_are_not(self, mock_sleep):
+        """Test a found issue is reused while a miss is looked up again"""
+        github_repo = Mock()
+        github_repo.get_issues.side_effect = [[], [], [make_issue(5)]]
+        coordinator = FlavorCoordinator(Mock(), github_repo, 'org/repo', COMMIT_SHA)
+
+        assert coordinator._find_coordination_issue() is None
+        assert coordinator._find_coordination_issue()['number'] == 5
+        assert coordinator._find_coordination_issue()['number'] == 5
+        assert github_repo.get_issues.call_count == 3
+
+
+class LabelExists(Exception):
+    """Stand-in for GithubException raised on a duplicate label"""
+    status = 422
+
+
+class TestShouldAnalyze:
+    """Test the commit lock taken before analysing a failure"""
+
+    @patch('agent.coordination.time.sleep')
+    def test_lock_winner_creates_issue(self, mock_sleep):
+        """Test the flavor that creates the lock label analyses the failure"""
+        github_repo = Mock()
+        github_repo.get_issues.return_value = []
+        github_repo.create_issue.return_value = make_issue(7)
+        coordinator = FlavorCoordinator(Mock(), github_repo, 'org/repo', COMMIT_SHA)
+
+        decision = coordinator.should_analyze('linux-x64')
+
+        assert decision == {'should_analyze': True, 'reason': 'first_to_fix', 'issue_number': 7}
+        github_repo.create_label.assert_called_once_with(name='lock-abcdef12', color='ededed')
+        body = github_repo.create_issue.call_args.kwargs['body']
+        assert f"**Commit:** {COMMIT_SHA}" in body
+        assert '**First Failing Flavor:** linux-x64' in body
+        assert re.search(r'\*\*Created:\*\* \d{4}-\d\d-\d\dT\d\d:\d\d:\d\dZ$', body, re.MULTILINE)
+
+    @patch('agent.coordination.time.sleep')
+    def test_lock_loser_defers_to_existing_issue(self, mock_sleep):
+        """Test a flavor that loses the label race waits for the winner's issue"""
+        github_repo = Mock()
+        github_repo.get_issues.side_effect = [[], [], [], [make_issue(8)]]
+        github_repo.create_label.side_effect = LabelExists()
+        coordinator = FlavorCoordinator(Mock(), github_repo, 'org/repo', COMMIT_SHA)
+
+        decision = coordinator.should_analyze('windows')
+
+        assert decision['should_analyze'] is False
+        assert decision['issue_number'] == 8
+        github_repo.create_issue.assert_not_called()
+
+    @patch('agent.coordination.time.sleep')
+    def test_stale_lock_without_issue_proceeds(self, mock_sleep):
+        """Test a leftover lock with no open issue does not block analysis"""
+        github_repo = Mock()
+        github_repo.get_issues.return_value = []
+        github_repo.create_label.side_effect = LabelExists()
+        github_repo.create_issue.return_value = make_issue(9)
+        coordinator = FlavorCoordinator(Mock(), github_repo, 'org/repo', COMMIT_SHA)
+
+        decision = coordinator.should_analyze('jetson-arm64')
+
+        assert decision['should_analyze'] is True
+        assert decision['issue_number'] == 9
+
+
+    @patch('agent.coordination.time.sleep')
+    def test_stale_lock_duplicate_defers_to_lowest_issue(self, mock_sleep):
+        """Test flavors racing past a stale lock keep only the lowest-numbered issue"""
+        github_repo = Mock()
+        ours, theirs = make_issue(11), make_issue(10)
+        github_repo.get_issues.side_effect = [[], [], [], [], [], [], [], [], [ours, theirs]]
+        github_repo.create_label.side_effect = LabelExists()
+        github_repo.create_issue.return_value = ours
+        coordinator = FlavorCoordinator(Mock(), github_repo, 'org/repo', COMMIT_SHA)
+
+        decision = coordinator.should_analyze('windows')
+
+        assert decision == {'should_analyze': False, 'reason': 'another_workflow_fixing', 'issue_number': 10}
+        ours.edit.assert_called_once_with(state='closed')
+        ours.create_comment.assert_called_once_with('Duplicate of #10')
+
+    @patch('agent.coordination.time.sleep')
+    def test_lock_error_dedupes_issues(self, mock_sleep):
+        """Test a non-422 label error falls back to lowest-issue dedupe"""
+        github_repo = Mock()
+        ours, theirs = make_issue(21), make_issue(20)
+        github_repo.get_issues.side_effect = [[], [], [ours, theirs]]
+        github_repo.create_label.side_effect = RuntimeError('502 Bad Gateway')
+        github_repo.create_issue.return_value = ours
+        coordinator = FlavorCoordinator(Mock(), github_repo, 'org/repo', COMMIT_SHA)
+
+        decision = coordinator.should_analyze('linux-x64')
+
+        assert decision['should_analyze'] is False
+        assert decision['issue_number'] == 20
+        ours.edit.assert_called_once_with(state='closed')
+
+    @patch('agent.coordination.time.sleep')
+    def test_lock_released_when_issue_creation_fails(self, mock_sleep):
+        """Test the lock is dropped if no coordination issue could be created"""
+        github_repo = Mock()
+        github_repo.get_issues.return_value = []
+        github_repo.create_issue.side_effect = RuntimeError('boom')
+        coordinator = FlavorCoordinator(Mock(), github_repo, 'org/repo', COMMIT_SHA)
+
+        decision = coordinator.should_analyze('linux-x64')
+
+        assert decision['should_analyze'] is True
+        github_repo.get_label.assert_called_once_with('lock-abcdef12')
+        github_repo.get_label.return_value.delete.assert_called_once()
+
+
+class TestMarkFixComplete:
+    """Test wrapping up a coordinated fix"""
+
+    def test_releases_commit_lock(self):
+        """Test the lock label is deleted once the fix is complete"""
+        github_repo = Mock()
+        github_repo.get_issue.return_value.get_comments.return_value = []
+        coordinator = FlavorCoordinator(Mock(), github_repo, 'org/repo', COMMIT_SHA)
+
+        coordinator.mark_fix_complete(7, 'autonomous-fix-1', 12)
+
+        github_repo.get_label.assert_called_once_with('lock-abcdef12')
+        github_repo.get_label.return_value.delete.assert_called_once()
+
+
+class TestCountWaitingFlavors:
+    """Test counting flavors that reported the same failure"""
+
+    def test_counts_flavor_comments_once(self):
+        """Test only flavor comments are counted and the issue is read once"""
+        github_repo = Mock()
+        comments = [Mock(body='### Flavor: windows\n...'), Mock(body='unrelated'),
+                    Mock(body='### Flavor: jetson-arm64\n...'), Mock(body=None)]
+        github_repo.get_issue.return_value.get_comments.return_value = comments
+        coordinator = FlavorCoordinator(Mock(), github_repo, 'org/repo', COMMIT_SHA)
+
+        assert coordinator._count_waiting_flavors(7) == 2
+        assert coordinator._count_waiting_flavors(7) == 2
+        github_repo.get_issue.assert_called_once_with(7)
+
+    def test_reuses_issue_found_during_lookup(self):
+        """Test the issue listed by should_analyze is not fetched again"""
+        github_repo = Mock()
+        issue = make_issue(8)
+        issue.get_comments.return_value = [Mock(body='### Flavor: windows')]
+        github_repo.get_issues.return_value = [issue]
+        coordinator = FlavorCoordinator(Mock(), github_repo, 'org/repo', COMMIT_SHA)
+
+        coordinator.should_analyze('windows')
+
+        assert coordinator._count_waiting_flavors(8) == 1
+        github_repo.get_issue.assert_not_called()
+
+    def test_api_error_counts_zero(self):
+        """Test a failed lookup is not cached and reports no savings"""
+        github_repo = Mock()
+        github_repo.get_issue.side_effect = Exception('boom')
+        coordinator = FlavorCoordinator(Mock(), github_repo, 'org/repo', COMMIT_SHA)
+
+        assert coordinator._count_waiting_flavors(7) == 0
+        assert coordinator._flavor_count_cache == {}
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
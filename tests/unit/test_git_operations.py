@@ -90,6 +90,146 @@ class TestGitOperationsCriticalPaths:
                 assert Path(tmpdir, 'file2.py').exists()
                 assert Path(tmpdir, 'file3.py').exists()
 
+    def test_apply_multiple_file_changes_stages_once(self):
+        """Test all written and deleted paths are staged with one git call each"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            Path(tmpdir, 'old.py').write_text('old')
+
+            with patch('agent.git_operations.git.Repo'):
+                git_ops = GitOperations(tmpdir)
+
+                changes = [
+                    {'path': 'a.py', 'action': 'create', 'new_content': 'a'},
+                    {'path': 'old.py', 'action': 'delete'},
+                    {'path': 'b.py', 'action': 'replace', 'new_content': 'b'}
+                ]
+
+                result = git_ops.apply_file_changes(changes)
+
+                assert all(r['success'] for r in result)
+                git_ops.git_repo.git.add.assert_called_once_with('--', 'a.py', 'b.py')
+                git_ops.git_repo.git.rm.assert_called_once_with('--', 'old.py')
+
+    def test_apply_file_changes_batch_failure_marks_bad_path(self):
+        """Test a failed batched add is retried per path to find the bad one"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with patch('agent.git_operations.git.Repo'):
+                git_ops = GitOperations(tmpdir)
+
+                def add(*args):
+                    if 'bad.py' in args:
+                        raise RuntimeError('ignored by .gitignore')
+
+                git_ops.git_repo.git.add.side_effect = add
+
+                changes = [
+                    {'path': 'good.py', 'action': 'create', 'new_content': 'g'},
+                    {'path': 'bad.py', 'action': 'create', 'new_content': 'b'}
+                ]
+
+                result = git_ops.apply_file_changes(changes)
+
+                assert [r['success'] for r in result] == [True, False]
+                assert 'gitignore' in result[1]['error']
+
+    def test_apply_multiple_file_changes_preserves_order(self):
+        """Test results keep input order when a write fails mid-list"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            Path(tmpdir, 'blocker').write_text('not a directory')
+
+            with patch('agent.git_operations.git.Repo'):
+                git_ops = GitOperations(tmpdir)
+
+                changes = [
+                    {'path': 'a.py', 'action': 'create', 'new_content': 'a'},
+                    {'path': 'blocker/b.py', 'action': 'create', 'new_content': 'b'},
+                    {'path': 'c.py', 'action': 'replace', 'new_content': 'c'}
+                ]
+
+                result = git_ops.apply_file_changes(changes)
+
+                assert [r['path'] for r in result] == ['a.py', 'blocker/b.py', 'c.py']
+                assert [r['success'] for r in result] == [True, False, True]
+                assert Path(tmpdir, 'c.py').read_text() == 'c'
+
+    def test_apply_file_changes_keeps_list_order_for_shared_paths(self):
+        """Test delete-then-recreate and repeated writes apply in list order"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            Path(tmpdir, 'a.py').write_text('old')
+
+            with patch('agent.git_operations.git.Repo'):
+                git_ops = GitOperations(tmpdir)
+
+                changes = [
+                    {'path': 'a.py', 'action': 'delete'},
+                    {'path': 'a.py', 'action': 'create', 'new_content': 'recreated'},
+                    {'path': 'b.py', 'action': 'create', 'new_content': 'first'},
+                    {'path': 'b.py', 'action': 'replace', 'new_content': 'second'}
+                ]
+
+                result = git_ops.apply_file_changes(changes)
+
+                assert all(r['success'] for r in result)
+                assert Path(tmpdir, 'a.py').read_text() == 'recreated'
+                assert Path(tmpdir, 'b.py').read_text() == 'second'
+
+    def test_branch_and_commit_in_real_repo(self):
+        """Test a fix branch is created from base and the fix committed on it"""
+        import subprocess
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            def git(*args):
+                return subprocess.run(['git', '-c', 'user.name=t', '-c', 'user.email=t@t', *args],
+                                      cwd=tmpdir, check=True, capture_output=True, text=True).stdout
+
+            git('init', '-q', '-b', 'main')
+            git('config', 'user.name', 't')
+            git('config', 'user.email', 't@t')
+            git('commit', '-q', '--allow-empty', '-m', 'base')
+            git('checkout', '-q', '-b', 'other')
+
+            git_ops = GitOperations(tmpdir)
+            branch = git_ops.create_fix_branch('42', base_branch='main')
+
+            assert git('rev-parse', '--abbrev-ref', 'HEAD').strip() == branch.name
+            assert branch.commit_sha == git('rev-parse', 'main').strip()
+
+            git_ops.apply_file_changes([{'path': 'fix.py', 'action': 'create', 'new_content': 'x'}])
+            fix_info = {
+                'analysis': {'root_cause': 'missing file', 'confidence': 0.9},
+                'fix': {'description': 'Add fix.py', 'reasoning': 'r', 'files_to_change': []}
+            }
+            sha = git_ops.commit_fix('42', 1, fix_info, [])
+
+            assert git('rev-parse', 'HEAD').strip() == sha
+            assert git('log', '-1', '--format=%an <%ae>|%cn <%ce>').strip() == (
+                'Autonomous Agent <autonomous-agent@apra.ai>|Autonomous Agent <autonomous-agent@apra.ai>')
+            assert git('show', '--name-only', '--format=', 'HEAD').split() == ['fix.py']
+
+    def test_delete_then_recreate_in_real_repo(self):
+        """Test a tracked file deleted and recreated in one fix is staged as an edit"""
+        import subprocess
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            def git(*args):
+                return subprocess.run(['git', '-c', 'user.name=t', '-c', 'user.email=t@t', *args],
+                                      cwd=tmpdir, check=True, capture_output=True, text=True).stdout
+
+            git('init', '-q', '-b', 'main')
+            Path(tmpdir, 'a.py').write_text('old\n')
+            git('add', 'a.py')
+            git('commit', '-q', '-m', 'base')
+
+            git_ops = GitOperations(tmpdir)
+            result = git_ops.apply_file_changes([
+                {'path': 'a.py', 'action': 'delete'},
+                {'path': 'a.py', 'action': 'create', 'new_content': 'new\n'}
+            ])
+
+            assert [r['success'] for r in result] == [True, True]
+            assert Path(tmpdir, 'a.py').read_text() == 'new\n'
+            assert git('diff', '--cached', '--name-status').split() == ['M', 'a.py']
+
     @pytest.mark.skip(reason="Method signature requires previous_attempts parameter")
     def test_commit_fix_formats_message(self):
         """Test commit fix creates proper commit message"""
@@ -102,12 +242,64 @@ class TestGitOperationsCriticalPaths:
         # Skipped: Requires proper mock of git branches
         pass
 
+    def test_push_branch_skips_hooks(self):
+        """Test pushes go to the branch ref without running pre-push hooks"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with patch('agent.git_operations.git.Repo'):
+                git_ops = GitOperations(tmpdir)
+
+                assert git_ops.push_branch('autonomous-fix-1', force=True) is True
+                git_ops.git_repo.remote.return_value.push.assert_called_once_with(
+                    'HEAD:refs/heads/autonomous-fix-1', force=True, no_verify=True)
+
+    def test_create_pull_request_updates_existing(self):
+        """Test an open PR for the branch is edited instead of opening another"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with patch('agent.git_operations.git.Repo'):
+                git_ops = GitOperations(tmpdir)
+                git_ops.github_repo = Mock()
+                existing = Mock(number=12, html_url='https://github.com/org/repo/pull/12')
+                git_ops.github_repo.get_pulls.return_value = [existing]
+
+                pr = git_ops.create_pull_request('Fix build', 'body', 'autonomous-fix-1')
+
+                assert pr.number == 12
+                existing.edit.assert_called_once_with(title='Fix build', body='body')
+                git_ops.github_repo.create_pull.assert_not_called()
+
     @pytest.mark.skip(reason="Push logic has additional checks")
     def test_push_branch(self):
         """Test pushing branch - CRITICAL PATH"""
         # Skipped: Requires proper mock of git push flow
         pass
 
+    def test_load_previous_attempts_cached_until_commit(self):
+        """Test attempt history is listed once and refreshed after a new commit"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with patch('agent.git_operations.git.Repo'):
+                git_ops = GitOperations(tmpdir)
+                git_ops.github_repo = Mock()
+                head = Mock(sha='abc123')
+                head.commit.message = "**Fix Applied:**\nAdd include\n\n---"
+                git_ops.github_repo.get_commits.return_value = [head]
+
+                first = git_ops.load_previous_attempts('123', max_attempt=3)
+                second = git_ops.load_previous_attempts('123', max_attempt=3)
+
+                assert [a['attempt_num'] for a in first] == [1, 2]
+                assert first[0]['fix_applied'] == 'Add include'
+                assert second == first
+                git_ops.github_repo.get_commits.assert_called_once()
+
+                fix_info = {
+                    'analysis': {'root_cause': 'missing include', 'confidence': 0.9},
+                    'fix': {'description': 'Add include', 'reasoning': 'r', 'files_to_change': []}
+                }
+                git_ops.commit_fix('123', 3, fix_info, first)
+                git_ops.load_previous_attempts('123', max_attempt=3)
+
+                assert git_ops.github_repo.get_commits.call_count == 2
+
 
 class TestGitOperationsErrorHandling:
     """Test error handling in git operations"""
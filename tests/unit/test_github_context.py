@@ -0,0 +1,117 @@
+"""
+Focused unit tests for GitHubContextFetcher
+
+Tests the gh CLI log streaming used to pull GitHub error annotations.
+"""
+import io
+import subprocess
+import pytest
+from agent import github_context
+from agent.github_context import GitHubContextFetcher
+
+
+class FakePopen:
+    """Stand-in for subprocess.Popen streaming canned gh output"""
+
+    def __init__(self, lines, returncode=0):
+        self.stdout = io.StringIO(''.join(lines))
+        self.returncode = None
+        self._exit_code = returncode
+        self.killed = False
+
+    def kill(self):
+        self.killed = True
+        self.stdout = io.StringIO('')
+        self._exit_code = -9
+
+    def poll(self):
+        return self.returncode
+
+    def wait(self):
+        self.returncode = self._exit_code
+        return self.returncode
+
+
+class ImmediateTimer:
+    """threading.Timer stand-in that fires as soon as it is started"""
+
+    def __init__(self, interval, function):
+        self.function = function
+
+    def start(self):
+        self.function()
+
+    def cancel(self):
+        pass
+
+
+@pytest.fixture
+def fake_gh(monkeypatch):
+    """Route the job listing and log stream through canned gh output"""
+    procs = []
+
+    def run(cmd, **kwargs):
+        return subprocess.CompletedProcess(cmd, 0, stdout='build-linux|42\n', stderr='')
+
+    def install(lines, returncode=0):
+        def popen(cmd, **kwargs):
+            procs.append(FakePopen(lines, returncode))
+            return procs[-1]
+
+        monkeypatch.setattr(github_context.subprocess, 'run', run)
+        monkeypatch.setattr(github_context.subprocess, 'Popen', popen)
+        return procs
+
+    return install
+
+
+def numbered(count, errors=()):
+    return [f"x\t##[error]line {i}\n" if i in errors else f"line {i}\n" for i in range(count)]
+
+
+class TestFetchJobLogs:
+    """Test streaming job logs from the gh CLI"""
+
+    def test_no_error_lines(self, fake_gh):
+        """Test a clean log yields no annotations or context windows"""
+        fake_gh(numbered(50))
+
+        result = GitHubContextFetcher('', '', run_id='1').fetch_job_logs('linux')
+
+        assert result['status'] == 'success'
+        assert result['error_count'] == 0
+        assert result['context_windows'] == []
+        assert result['full_logs_head'] == ''.join(numbered(50))
+        assert result['full_logs_tail'] == ''
+
+    def test_overlapping_windows_are_merged(self, fake_gh, monkeypatch):
+        """Test nearby errors share one window and no line is repeated"""
+        monkeypatch.setattr(github_context, 'LOG_CONTEXT_LINES', 3)
+        fake_gh(numbered(40, errors={10, 16, 30}))
+
+        result = GitHubContextFetcher('', '', run_id='1').fetch_job_logs('linux')
+
+        assert result['error_count'] == 3
+        first, second = result['context_windows']
+        assert first == ''.join(numbered(40, errors={10, 16, 30})[7:20])
+        assert second == ''.join(numbered(40, errors={10, 16, 30})[27:34])
+
+    def test_timeout_kills_gh(self, fake_gh, monkeypatch):
+        """Test a gh process that outlives the timeout is killed and reported"""
+        monkeypatch.setattr(github_context.threading, 'Timer', ImmediateTimer)
+        procs = fake_gh(numbered(10, errors={5}))
+
+        result = GitHubContextFetcher('', '', run_id='1').fetch_job_logs('linux')
+
+        assert result['status'] == 'error'
+        assert result['error'] == 'Timeout fetching job logs'
+        assert procs[0].killed
+
+    def test_gh_failure_reports_stderr(self, fake_gh):
+        """Test a failing gh log command surfaces as an error result"""
+        fake_gh(numbered(3), returncode=1)
+
+        result = GitHubContextFetcher('', '', run_id='1').fetch_job_logs('linux')
+
+        assert result['status'] == 'error'
+        assert result['error'].startswith('Failed to fetch logs')